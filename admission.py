@@ -0,0 +1,90 @@
+import os
+import threading
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Ticket:
+    """Proof of admission; hand it back to `AdmissionController.release` when the call ends."""
+    __slots__ = ("bypass",)
+
+    def __init__(self, bypass: bool = False):
+        self.bypass = bypass
+
+
+class AdmissionController:
+    """Load shedding in front of the model backend.
+
+    A call is admitted only if the wait it would face is predicted to fit
+    the queueing budget: with `active` calls admitted and `limit` slots,
+    the expected wait is roughly (active - limit + 1) / limit times the
+    recent average call duration. Calls that would overflow the bounded
+    queue or the budget are shed so they can be answered immediately.
+    High-risk calls are never shed and never counted against the queue.
+    """
+
+    def __init__(self, limit: Optional[int] = None, max_queue: Optional[int] = None,
+                 queue_budget: Optional[float] = None, initial_service_time: float = 2.0,
+                 smoothing: float = 0.2):
+        self.limit = max(1, limit or int(os.environ.get("ADMISSION_LIMIT", "4")))
+        self.max_queue = max(0, max_queue if max_queue is not None else int(os.environ.get("ADMISSION_MAX_QUEUE", "16")))
+        if queue_budget is None:
+            queue_budget = float(os.environ.get("ADMISSION_QUEUE_BUDGET", "2.0"))
+        self.queue_budget = queue_budget
+        self.smoothing = smoothing
+        self._service_time = initial_service_time
+        self._active = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "admitted": 0,
+            "bypassed": 0,
+            "shed_queue_full": 0,
+            "shed_over_budget": 0,
+        }
+
+    def _predicted_wait(self, active: int) -> float:
+        ahead = active - self.limit + 1
+        return 0.0 if ahead <= 0 else ahead / self.limit * self._service_time
+
+    def try_admit(self, risk: str = "low") -> Optional[Ticket]:
+        """Return a Ticket, or None if the call should be shed."""
+        with self._lock:
+            if risk == "high":
+                self._counters["bypassed"] += 1
+                return Ticket(bypass=True)
+            waiting = max(0, self._active - self.limit)
+            if waiting >= self.max_queue and self._active >= self.limit:
+                self._counters["shed_queue_full"] += 1
+                return None
+            if self._predicted_wait(self._active) > self.queue_budget:
+                self._counters["shed_over_budget"] += 1
+                return None
+            self._active += 1
+            self._counters["admitted"] += 1
+            return Ticket()
+
+    def release(self, ticket: Ticket, service_time: Optional[float] = None):
+        with self._lock:
+            if not ticket.bypass:
+                self._active -= 1
+            if service_time is not None:
+                self._service_time += self.smoothing * (service_time - self._service_time)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            shed = self._counters["shed_queue_full"] + self._counters["shed_over_budget"]
+            decided = self._counters["admitted"] + shed
+            return {
+                **self._counters,
+                "shed": shed,
+                "shed_rate": (shed / decided) if decided else 0.0,
+                "active": self._active,
+                "waiting": max(0, self._active - self.limit),
+                "limit": self.limit,
+                "max_queue": self.max_queue,
+                "queue_budget_seconds": self.queue_budget,
+                "avg_service_seconds": round(self._service_time, 3),
+                "predicted_wait_seconds": round(self._predicted_wait(self._active), 3),
+            }
@@ -0,0 +1,140 @@
+"""Offline re-scoring of JSONL transcripts: risk tier, distress phrases and intent per line.
+
+Streams the input, classifies chunks of lines across a process pool and
+writes results in input order. At most `--window` chunks are in flight,
+so memory stays flat however large the file is.
+
+    python batch_classify.py transcripts.jsonl -o scored.jsonl
+    python batch_classify.py requests.jsonl --field body --workers 4
+
+Each worker holds its own copy of the intent model, so memory grows with
+`--workers`; the default is small and every worker runs torch on a single
+thread. Lines that are not a JSON object or string are reported on stderr
+and skipped.
+"""
+import argparse
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+TEXT_FIELDS = ("text", "message", "body")
+DEFAULT_WORKERS = 2
+
+
+def record_text(record: Any, field: Optional[str]) -> str:
+    if isinstance(record, str):
+        return record
+    if field:
+        return str(record.get(field) or "")
+    for name in TEXT_FIELDS:
+        if record.get(name):
+            return str(record[name])
+    return ""
+
+
+def _classify_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    # Imported in the worker so the parent never loads models or starts threads before forking
+    from chatbot import classify_texts
+    return classify_texts(texts)
+
+
+def _warm_worker():
+    # One intra-op thread per worker: N workers already use N cores, torch's default would start N x cores
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+    import chatbot
+    chatbot.intent_cascade.warm_up()
+
+
+def read_chunks(lines: TextIO, size: int) -> Iterator[List[Tuple[int, str]]]:
+    """Non-blank lines with their 1-based line numbers, `size` at a time."""
+    lines = ((n, line) for n, line in enumerate(lines, 1) if line.strip())
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_records(chunk: List[Tuple[int, str]], errors: TextIO) -> List[Any]:
+    """JSON objects and strings from `chunk`; anything else is reported to `errors` and dropped."""
+    records = []
+    for lineno, line in chunk:
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            print(f"line {lineno}: invalid JSON ({e}), skipped", file=errors)
+            continue
+        if not isinstance(record, (dict, str)):
+            print(f"line {lineno}: expected an object or a string, got {type(record).__name__}, skipped",
+                  file=errors)
+            continue
+        records.append(record)
+    return records
+
+
+def process(src: TextIO, dst: TextIO, field: Optional[str] = None, workers: int = DEFAULT_WORKERS,
+            chunk_size: int = 64, window: Optional[int] = None, errors: Optional[TextIO] = None) -> int:
+    """Classify every line of `src` into `dst`; returns the number of records written."""
+    window = window or workers * 2
+    errors = errors or sys.stderr
+    pending = deque()
+    written = 0
+
+    def drain_one():
+        nonlocal written
+        records, future = pending.popleft()
+        for record, result in zip(records, future.result()):
+            if isinstance(record, dict):
+                record = {**record, "classification": result}
+            else:
+                record = {"text": record, "classification": result}
+            dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+            written += 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+        for chunk in read_chunks(src, chunk_size):
+            records = parse_records(chunk, errors)
+            if not records:
+                continue
+            texts = [record_text(r, field) for r in records]
+            pending.append((records, pool.submit(_classify_chunk, texts)))
+            if len(pending) >= window:
+                drain_one()
+        while pending:
+            drain_one()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file, or - for stdout")
+    parser.add_argument("--field", help=f"field holding the text (default: first of {', '.join(TEXT_FIELDS)})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"processes, each with its own model copy (default {DEFAULT_WORKERS})")
+    parser.add_argument("--chunk-size", type=int, default=64, help="lines per task")
+    parser.add_argument("--window", type=int, help="max chunks in flight (default: 2 x workers)")
+    args = parser.parse_args()
+
+    src = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        n = process(src, dst, field=args.field, workers=args.workers,
+                    chunk_size=args.chunk_size, window=args.window)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    print(f"classified {n} records", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
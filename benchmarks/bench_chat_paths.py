@@ -0,0 +1,111 @@
+"""Micro-benchmark: the per-message work in chatbot.py that does not involve the LLM.
+
+Times classify_risk, classify_intent (centroid cascade with the zero-shot
+model unavailable, so the fallback runs too; `--zero-shot` loads the real
+model), session get/save for the memory and SQLite stores, _open_session,
+and the canned and high-risk process_message paths end to end. Every call
+is timed on its own, so p95/p99 show stalls that a mean would hide.
+
+    python benchmarks/bench_chat_paths.py
+    python benchmarks/bench_chat_paths.py --save-baseline paths_baseline.json
+    python benchmarks/bench_chat_paths.py --baseline paths_baseline.json   # exit 1 on regression
+
+Baselines only mean something on the machine that recorded them.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# Logs would otherwise go to chatbot.log in the repo root
+os.environ.setdefault("LOG_FILE", "")
+os.environ.setdefault("LOG_CONSOLE", "0")
+
+import chatbot  # noqa: E402
+from intent_cascade import IntentCascade  # noqa: E402
+from intent_engine import IntentEngine  # noqa: E402
+from perf_report import add_arguments, finish, print_table, summarize  # noqa: E402
+from session_store import MemorySessionStore, SQLiteSessionStore  # noqa: E402
+
+LOW = ["my roommate and I keep arguing and I can't focus on anything",
+       "I haven't slept properly in a week and my grades are slipping",
+       "I'm nervous about presenting my project in front of everyone"]
+MEDIUM = ["I've been really sad and feel depressed most days"]
+HIGH = ["I want to kill myself", "sometimes I think about killing myself"]
+CANNED = ["hi", "thanks", "I feel stressed about exams"]
+
+
+class NoAgent:
+    def run(self, query, max_tokens=128):
+        raise AssertionError("benchmark path reached the LLM")
+
+
+def no_model():
+    raise ImportError("zero-shot model disabled for the benchmark")
+
+
+def timed(name, fn, inputs, iterations, warmup=200):
+    """Call fn(x) `iterations` times cycling through inputs; one latency per call."""
+    for i in range(warmup):
+        fn(inputs[i % len(inputs)])
+    latencies = []
+    clock = time.perf_counter
+    started = clock()
+    for i in range(iterations):
+        x = inputs[i % len(inputs)]
+        t = clock()
+        fn(x)
+        latencies.append(clock() - t)
+    return summarize(name, latencies, clock() - started)
+
+
+def session_roundtrip(store):
+    def roundtrip(session_id):
+        sess = store.get(session_id)
+        sess["last_topic"] = "exams"
+        store.save(session_id, sess)
+    return roundtrip
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--zero-shot", action="store_true", help="let uncertain intents reach the zero-shot model")
+    add_arguments(parser, tolerance=0.5, min_delta_ms=0.02)
+    args = parser.parse_args()
+    n = args.iterations
+
+    if not args.zero_shot:
+        chatbot.intent_cascade = IntentCascade(IntentEngine(backend_factory=no_model),
+                                               chatbot.data_file_candidates("intent_seed.jsonl"))
+    chatbot.preload()
+    session_ids = [f"bench-{i}" for i in range(1000)]
+    summaries = [
+        timed("classify_risk/low", chatbot.classify_risk, LOW + MEDIUM, n),
+        timed("classify_risk/high", chatbot.classify_risk, HIGH, n),
+        timed("classify_intent", chatbot.classify_intent, LOW + MEDIUM + CANNED, n),
+        timed("intent_fallback", chatbot.classify_intent_fallback, LOW + MEDIUM + CANNED, n),
+        timed("session/memory", session_roundtrip(MemorySessionStore()), session_ids, n),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSessionStore(os.path.join(tmp, "sessions.db"))
+        summaries.append(timed("session/sqlite", session_roundtrip(store), session_ids, max(1, n // 4)))
+
+    chatbot.session_store = MemorySessionStore()
+    summaries.append(timed("open_session", lambda sid: chatbot._open_session(LOW[0], sid), session_ids, n))
+    agent = NoAgent()
+    summaries.append(timed("process/canned", lambda m: chatbot.process_message(agent, m, "bench"), CANNED, n))
+    summaries.append(timed("process/high_risk", lambda m: chatbot.process_message(agent, m, "bench"), HIGH, n))
+
+    print_table(summaries, unit="calls/s")
+    sys.exit(finish(args, summaries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Micro-benchmark: counsellor ranking with the index against a full scan, as the roster grows.
+
+The scan is the scoring from src/lib/counsellorRanking.ts applied to every
+counsellor and sorted; the index answers the same query for the top 10.
+Also times building the index and one incremental update.
+
+    python benchmarks/bench_counsellor_index.py
+"""
+import random
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from counsellor_index import Counsellor, CounsellorIndex, RankQuery, base_score, normalize  # noqa: E402
+
+FOCUS = ["Anxiety", "Stress", "Depression", "Academic", "Relationship", "Sleep", "Panic", "Mood", "Trauma",
+         "Grief", "Addiction", "Eating Disorders", "Career", "Family", "Peer Support", "Crisis"]
+SUFFIX = ["Management", "Counseling", "Therapy", "Support", "Specialist", "Care"]
+AFFILIATIONS = ["On-Campus", "Off-Campus", "Student Wellness Center", "City Clinic", "Telehealth"]
+LANGUAGES = ["English", "Hindi", "Tamil", "Gujarati", "Bengali", "Marathi"]
+QUERY = {"q1": "Anxiety", "q2": "Sleep", "q3": "On-Campus"}
+CLASSIFIED = "stress"
+
+
+def synthetic_roster(n, rng):
+    return [
+        Counsellor(
+            id=f"c{i}",
+            name=f"Counsellor {i}",
+            specialization=f"{' & '.join(rng.sample(FOCUS, rng.randint(1, 2)))} {rng.choice(SUFFIX)}",
+            affiliation=rng.choice(AFFILIATIONS),
+            fees=rng.choice([0, 250, 450, 700, 900]),
+            experience_years=rng.randint(0, 25),
+            languages=tuple(rng.sample(LANGUAGES, rng.randint(1, 3))),
+            bio="",
+        )
+        for i in range(n)
+    ]
+
+
+def scan(counsellors, answers, classified, k=10):
+    ranked = []
+    for c in counsellors:
+        spec, score = normalize(c.specialization), 0.0
+        for text, weight in ((answers.get("q1"), 5), (answers.get("q2"), 3), (answers.get("q3"), 2), (classified, 4)):
+            if text and normalize(text) in spec:
+                score += weight
+        aff, pref = normalize(c.affiliation), normalize(answers.get("q3"))
+        if "on-campus" in pref and "on" in aff:
+            score += 2
+        if "off-campus" in pref and "off" in aff:
+            score += 2
+        score += base_score(c.fees, c.experience_years)
+        ranked.append((-round(score, 2), -(c.experience_years or 0), c.fees or 0, c.id))
+    ranked.sort()
+    return ranked[:k]
+
+
+def per_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def main():
+    rng = random.Random(7)
+    query = RankQuery.from_answers(QUERY, CLASSIFIED)
+    print(f"{'roster':>7}  {'build (ms)':>10}  {'upsert (us)':>11}  {'scan (us)':>10}  {'index (us)':>10}  {'speedup':>7}")
+    for n in (1000, 5000, 20000, 50000):
+        counsellors = synthetic_roster(n, rng)
+        build = per_call(lambda: CounsellorIndex(counsellors), 1)
+        index = CounsellorIndex(counsellors)
+        assert [r.counsellor.id for r in index.rank(query)] == [key[3] for key in scan(counsellors, QUERY, CLASSIFIED)]
+
+        changed = counsellors[n // 2]
+        variants = [changed._replace(specialization="Grief Counseling"), changed]
+        flip = iter(variants * 10_000)
+        upsert = per_call(lambda: index.upsert(next(flip)), 1000)
+
+        scanned = per_call(lambda: scan(counsellors, QUERY, CLASSIFIED), max(1, 20000 // n))
+        ranked = per_call(lambda: index.rank(query), 200)
+        print(f"{n:>7}  {build * 1e3:>10.1f}  {upsert * 1e6:>11.1f}  {scanned * 1e6:>10.0f}  {ranked * 1e6:>10.0f}"
+              f"  {scanned / ranked:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
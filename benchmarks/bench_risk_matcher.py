@@ -0,0 +1,68 @@
+"""Micro-benchmark: compiled risk matcher vs. the per-phrase re.search loop.
+
+Grows the phrase list synthetically and times one scan of a typical message.
+The compiled matcher should stay roughly flat; the loop grows linearly.
+
+    python benchmarks/bench_risk_matcher.py
+"""
+import json
+import random
+import re
+import string
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from phrase_matcher import RiskMatcher  # noqa: E402
+
+MESSAGE = (
+    "honestly i've been feeling really overwhelmed with assignments this week and i can't "
+    "sleep properly, my friends say i should talk to someone but i don't know where to start"
+)
+
+
+def loop_classify(words, text):
+    text_lower = text.lower()
+    for word in words["high_risk"]:
+        if re.search(rf"\b{re.escape(word)}\b", text_lower):
+            return "high"
+    for word in words["medium_risk"]:
+        if re.search(rf"\b{re.escape(word)}\b", text_lower):
+            return "medium"
+    return "low"
+
+
+def synthetic_phrases(n, rng):
+    return [
+        " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(rng.randint(1, 3)))
+        for _ in range(n)
+    ]
+
+
+def main():
+    with open(ROOT / "data" / "distress_words.json", encoding="utf-8") as f:
+        base = json.load(f)
+    rng = random.Random(7)
+
+    print(f"{'phrases':>8}  {'compiled (us)':>14}  {'re.search loop (us)':>20}")
+    for extra in (0, 500, 2000, 5000):
+        words = {
+            "high_risk": base["high_risk"] + synthetic_phrases(extra // 2, rng),
+            "medium_risk": base["medium_risk"] + synthetic_phrases(extra - extra // 2, rng),
+        }
+        matcher = RiskMatcher.from_dict(words)
+        assert matcher.scan(MESSAGE).tier == loop_classify(words, MESSAGE)
+
+        n = 2000
+        compiled = min(timeit.repeat(lambda: matcher.scan(MESSAGE), number=n, repeat=3)) / n
+        loop_n = 20
+        loop = min(timeit.repeat(lambda: loop_classify(words, MESSAGE), number=loop_n, repeat=3)) / loop_n
+        total = len(words["high_risk"]) + len(words["medium_risk"])
+        print(f"{total:>8}  {compiled * 1e6:>14.1f}  {loop * 1e6:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Micro-benchmark: quick-response rule matching as the rule set grows.
+
+Adds synthetic rules on top of data/quick_responses.json and times one
+match of a message that hits none of them (the most expensive case).
+
+    python benchmarks/bench_rules.py
+"""
+import json
+import random
+import string
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rules_engine import RuleSet  # noqa: E402
+
+MESSAGE = "i keep putting off my chemistry assignment and i don't really know how to start it"
+
+
+def synthetic_rules(n, rng):
+    return [
+        {
+            "id": f"synthetic_{i}",
+            "priority": 1000 + i,
+            "phrases": ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(3)],
+            "reply": "synthetic",
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    with open(ROOT / "data" / "quick_responses.json", encoding="utf-8") as f:
+        base = json.load(f)
+    rng = random.Random(11)
+
+    print(f"{'rules':>6}  {'phrases':>8}  {'match (us)':>11}")
+    for extra in (0, 100, 500, 2000):
+        rules = RuleSet(base["rules"] + synthetic_rules(extra, rng), base["intents"])
+        n = 5000
+        per_call = min(timeit.repeat(lambda: rules.match(MESSAGE), number=n, repeat=3)) / n
+        print(f"{len(base['rules']) + extra:>6}  {len(rules.targets):>8}  {per_call * 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Startup benchmark: import time, and time from launch to /health, /ready and the first chat reply.
+
+Each measurement starts a fresh interpreter. The chat message is a canned
+one, so no Ollama is needed; set --message to exercise the model instead.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --workers 4     # pre-forked server (server/prefork.py)
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def import_seconds(module, env):
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(url, body=None, timeout=30.0):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def wait_for(url, deadline, status=200):
+    while time.perf_counter() < deadline:
+        if request(url, timeout=1.0) == status:
+            return time.perf_counter()
+        time.sleep(0.01)
+    raise TimeoutError(url)
+
+
+def server_timings(workers, message, env, timeout):
+    port = free_port()
+    env = dict(env, PORT=str(port), WEB_CONCURRENCY=str(workers))
+    if workers > 1:
+        cmd = [sys.executable, "-m", "server.prefork"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "server.main:app", "--port", str(port), "--log-level", "warning"]
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=dict(env, HOST="127.0.0.1"),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = started + timeout
+        healthy = wait_for(base + "/health", deadline)
+        ready = wait_for(base + "/ready", deadline)
+        if request(base + "/api/chat", {"message": message}, timeout=timeout) != 200:
+            raise RuntimeError("first /api/chat failed")
+        replied = time.perf_counter()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return healthy - started, ready - started, replied - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--message", default="hi")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    # Logs would otherwise go to chatbot.log in the repo root
+    env = dict(os.environ, LOG_FILE="", LOG_CONSOLE="0")
+
+    print(f"{'import':<14}  {'min (ms)':>9}  {'median (ms)':>11}")
+    for module in ("chatbot", "server.main"):
+        runs = [import_seconds(module, env) for _ in range(args.repeat)]
+        print(f"{module:<14}  {min(runs) * 1000:>9.1f}  {statistics.median(runs) * 1000:>11.1f}")
+
+    print(f"\nserver, {args.workers} worker(s), median of {args.repeat} launches")
+    runs = [server_timings(args.workers, args.message, env, args.timeout) for _ in range(args.repeat)]
+    for i, label in enumerate(("listening (/health)", "ready (/ready)", "first /api/chat reply")):
+        print(f"  {label:<24} {statistics.median(r[i] for r in runs) * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Offline evaluation: intent cascade accuracy and latency at several thresholds.
+
+Runs k-fold cross-validation over data/intent_seed.jsonl. For each fold the
+centroid model is trained on the other folds; held-out messages that fall
+below the threshold are sent to the zero-shot model when transformers is
+installed, and counted as deferred otherwise.
+
+    python benchmarks/eval_intent_cascade.py [--folds 5] [--thresholds 0.4,0.6,0.8]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from intent_cascade import CentroidIntentModel  # noqa: E402
+from intent_engine import IntentEngine, IntentModelUnavailable  # noqa: E402
+
+
+def load_seed(path):
+    with open(path, encoding="utf-8") as f:
+        return [(r["text"], r["label"]) for r in map(json.loads, f) if r]
+
+
+def folds(rows, k, seed=7):
+    rows = rows[:]
+    random.Random(seed).shuffle(rows)
+    for i in range(k):
+        test = rows[i::k]
+        train = [r for j, r in enumerate(rows) if j % k != i]
+        yield train, test
+
+
+def zero_shot_labels(texts):
+    """Labels from the zero-shot model, plus seconds per message; None if it can't load."""
+    engine = IntentEngine()
+    if not engine.warm_up():
+        return None, None
+    started = time.perf_counter()
+    try:
+        labels = engine.classify_batch(texts)
+    except IntentModelUnavailable:
+        return None, None
+    return labels, (time.perf_counter() - started) / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed-file", default=str(ROOT / "data" / "intent_seed.jsonl"))
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--thresholds", default="0.3,0.4,0.5,0.6,0.7,0.8,0.9")
+    args = parser.parse_args()
+    thresholds = [float(t) for t in args.thresholds.split(",")]
+
+    rows = load_seed(args.seed_file)
+    held_out = []  # (text, gold, predicted, confidence)
+    fast_seconds = 0.0
+    for train, test in folds(rows, args.folds):
+        model = CentroidIntentModel.train(train)
+        for text, gold in test:
+            started = time.perf_counter()
+            prediction = model.predict(text)
+            fast_seconds += time.perf_counter() - started
+            held_out.append((text, gold, prediction.label, prediction.confidence))
+    n = len(held_out)
+    fast_accuracy = sum(gold == pred for _, gold, pred, _ in held_out) / n
+
+    zs_labels, zs_latency = zero_shot_labels([text for text, *_ in held_out])
+    print(f"{n} held-out messages, {args.folds} folds")
+    print(f"stage 1 alone: accuracy {fast_accuracy:.3f}, {fast_seconds / n * 1e6:.1f} us/message")
+    if zs_labels is None:
+        print("zero-shot baseline: skipped (transformers/torch or the model is unavailable)")
+    else:
+        zs_accuracy = sum(gold == label for (_, gold, *_), label in zip(held_out, zs_labels)) / n
+        print(f"zero-shot alone: accuracy {zs_accuracy:.3f}, {zs_latency * 1e3:.1f} ms/message")
+
+    print()
+    print(f"{'threshold':>9}  {'stage1 %':>8}  {'stage1 acc':>10}  {'cascade acc':>11}  {'est ms/msg':>10}")
+    for threshold in thresholds:
+        confident = [i for i, (*_, conf) in enumerate(held_out) if conf >= threshold]
+        stage1_acc = (sum(held_out[i][1] == held_out[i][2] for i in confident) / len(confident)) if confident else 0.0
+        if zs_labels is None:
+            cascade_acc, est_ms = "-", "-"
+        else:
+            chosen = set(confident)
+            correct = sum(
+                gold == (pred if i in chosen else zs_labels[i]) for i, (_, gold, pred, _) in enumerate(held_out)
+            )
+            cascade_acc = f"{correct / n:.3f}"
+            est_ms = f"{(n - len(confident)) / n * zs_latency * 1e3 + fast_seconds / n * 1e3:.2f}"
+        print(f"{threshold:>9.2f}  {len(confident) / n * 100:>7.1f}%  {stage1_acc:>10.3f}  {cascade_acc:>11}  {est_ms:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Local stand-in for the Ollama HTTP API, for load tests and benchmarks without a GPU.
+
+Serves /api/chat and /api/generate (streamed NDJSON or a single JSON body,
+as Ollama does), plus /api/tags, /api/version and /. Replies are made of
+canned tokens with a configurable time to first token and per-token delay,
+so the backend behaves like a busy model rather than an instant stub.
+`options.num_predict` caps the token count the same way it does in Ollama.
+
+    python benchmarks/fake_ollama.py --port 11435 --first-token-ms 150 --token-ms 25
+    OLLAMA_HOST=http://127.0.0.1:11435 uvicorn server.main:app
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional
+
+REPLY = (
+    "That sounds like a lot to carry right now. Try box breathing for a minute: in for four, hold for four, "
+    "out for four, hold for four, and notice how your shoulders feel afterwards."
+)
+
+
+class FakeOllama:
+    """Threaded HTTP server speaking enough of the Ollama API for the agno Ollama model.
+
+    Use as a context manager, or `start()` / `stop()`; `url` is the value for OLLAMA_HOST.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, first_token_ms: float = 100.0,
+                 token_ms: float = 20.0, jitter: float = 0.0, reply: str = REPLY, max_tokens: int = 64,
+                 seed: Optional[int] = None):
+        self.first_token = first_token_ms / 1000.0
+        self.per_token = token_ms / 1000.0
+        self.jitter = jitter
+        self.tokens = [word + " " for word in reply.split()]
+        self.max_tokens = max_tokens
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.server = ThreadingHTTPServer((host, port), _handler(self))
+        self.server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeOllama":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "in_flight": self.in_flight, "max_in_flight": self.max_in_flight}
+
+    # -- generation --
+    def _delay(self, seconds: float):
+        if self.jitter:
+            with self._lock:
+                seconds *= 1.0 + self._rng.uniform(-self.jitter, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def generate(self, options: Dict[str, Any]) -> Iterator[str]:
+        """Yield tokens at the configured pace; the first after `first_token`."""
+        limit = int(options.get("num_predict") or self.max_tokens)
+        if limit < 0:
+            limit = self.max_tokens
+        self._delay(self.first_token)
+        for i, token in enumerate(self.tokens[:limit]):
+            if i:
+                self._delay(self.per_token)
+            yield token
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _final_fields(started: float, count: int) -> Dict[str, Any]:
+    total = int((time.perf_counter() - started) * 1e9)
+    return {
+        "done": True,
+        "done_reason": "stop",
+        "total_duration": total,
+        "load_duration": 0,
+        "prompt_eval_count": 16,
+        "prompt_eval_duration": 0,
+        "eval_count": count,
+        "eval_duration": total,
+    }
+
+
+def _handler(fake: FakeOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _json(self, status: int, body: Dict[str, Any]):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            if self.path == "/":
+                data = b"Ollama is running"
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            elif self.path == "/api/version":
+                self._json(200, {"version": "0.0.0-fake"})
+            elif self.path == "/api/tags":
+                self._json(200, {"models": [{"name": "llama3.2:latest", "model": "llama3.2:latest", "size": 0}]})
+            else:
+                self._json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path not in ("/api/chat", "/api/generate"):
+                self._json(404, {"error": "not found"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._json(400, {"error": "invalid JSON"})
+                return
+            with fake._lock:
+                fake.requests += 1
+                fake.in_flight += 1
+                fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+            try:
+                self._generate(request, chat=self.path == "/api/chat")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up (deadline hit); Ollama would stop generating too
+                pass
+            finally:
+                with fake._lock:
+                    fake.in_flight -= 1
+
+        def _chunk(self, chat: bool, model: str, text: str) -> Dict[str, Any]:
+            if chat:
+                return {"model": model, "created_at": _now(), "message": {"role": "assistant", "content": text},
+                        "done": False}
+            return {"model": model, "created_at": _now(), "response": text, "done": False}
+
+        def _generate(self, request: Dict[str, Any], chat: bool):
+            model = request.get("model", "llama3.2")
+            options = request.get("options") or {}
+            started = time.perf_counter()
+            if not request.get("stream", True):
+                tokens = list(fake.generate(options))
+                body = self._chunk(chat, model, "".join(tokens).strip())
+                body.update(_final_fields(started, len(tokens)))
+                self._json(200, body)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            count = 0
+            for token in fake.generate(options):
+                self._write_chunk(self._chunk(chat, model, token))
+                count += 1
+            final = self._chunk(chat, model, "")
+            final.update(_final_fields(started, count))
+            self._write_chunk(final)
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+        def _write_chunk(self, body: Dict[str, Any]):
+            line = json.dumps(body).encode() + b"\n"
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--first-token-ms", type=float, default=100.0)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    parser.add_argument("--jitter", type=float, default=0.0, help="relative +/- noise on every delay, e.g. 0.2")
+    parser.add_argument("--max-tokens", type=int, default=64)
+    args = parser.parse_args()
+
+    fake = FakeOllama(args.host, args.port, args.first_token_ms, args.token_ms, args.jitter, max_tokens=args.max_tokens)
+    print(f"Fake Ollama listening on {fake.url} (OLLAMA_HOST={fake.url})")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Load test: drive /api/chat at a fixed concurrency with a realistic message mix.
+
+By default starts benchmarks/fake_ollama.py in-process and a uvicorn server
+pointed at it (OLLAMA_HOST), waits for /ready, then keeps `--concurrency`
+clients busy for `--duration` seconds. Each client has its own session and
+picks canned, high-risk or free-text messages by `--mix`. Free text reaches
+the (fake) model; the response cache is off unless `--cache` is given, so
+repeats are not answered from memory. Pass `--url` to load an already
+running server instead; then the model is whatever that server talks to.
+
+    python benchmarks/load_chat.py --concurrency 16 --duration 20
+    python benchmarks/load_chat.py --save-baseline load_baseline.json
+    python benchmarks/load_chat.py --baseline load_baseline.json --tolerance 0.3   # exit 1 on regression
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_ollama import FakeOllama  # noqa: E402
+from perf_report import add_arguments, finish, print_table, summarize  # noqa: E402
+
+MESSAGES = {
+    "canned": ["hi", "hello", "thanks", "thank you so much", "bye", "I feel stressed about exams",
+               "how do I deal with exam anxiety", "good morning"],
+    "high_risk": ["I want to kill myself", "I can't go on, I've been thinking about suicide",
+                  "sometimes I think about killing myself"],
+    "free_text": ["my roommate and I keep arguing and I can't focus on anything",
+                  "I haven't slept properly in a week and my grades are slipping",
+                  "I feel lonely since moving away from home for university",
+                  "my parents expect me to become a doctor but I hate biology",
+                  "I procrastinate on every assignment and then panic at night",
+                  "I got rejected from the internship I really wanted",
+                  "everyone in my class seems to have it together except me",
+                  "I'm nervous about presenting my project in front of everyone"],
+}
+DEFAULT_MIX = "canned=0.35,high_risk=0.1,free_text=0.55"
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in MESSAGES:
+            raise argparse.ArgumentTypeError(f"unknown message kind {kind!r}; use {', '.join(MESSAGES)}")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+def start_server(port, ollama_url, cache, extra_env):
+    env = dict(os.environ, LOG_FILE="", LOG_CONSOLE="0", OLLAMA_HOST=ollama_url)
+    if not cache:
+        env["RESPONSE_CACHE_SIZE"] = "0"
+    env.update(extra_env)
+    cmd = [sys.executable, "-m", "uvicorn", "server.main:app", "--port", str(port), "--log-level", "warning",
+           "--no-access-log"]
+    return subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_ready(client, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.05)
+    raise TimeoutError("server never became ready")
+
+
+async def drive(client, args, mix):
+    """Run the clients; returns ({kind: [latency]}, {kind: errors}, wall seconds)."""
+    latencies, errors = defaultdict(list), defaultdict(int)
+    kinds, weights = list(mix), list(mix.values())
+
+    async def client_loop(n, until, record):
+        rng = random.Random(args.seed + n)
+        session_id = f"load-{n}"
+        while time.perf_counter() < until:
+            kind = rng.choices(kinds, weights)[0]
+            message = rng.choice(MESSAGES[kind])
+            started = time.perf_counter()
+            try:
+                resp = await client.post("/api/chat", json={"message": message, "session_id": session_id})
+                ok = resp.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if record:
+                if ok:
+                    latencies[kind].append(time.perf_counter() - started)
+                else:
+                    errors[kind] += 1
+
+    if args.warmup > 0:
+        until = time.perf_counter() + args.warmup
+        await asyncio.gather(*[client_loop(n, until, False) for n in range(args.concurrency)])
+    started = time.perf_counter()
+    until = started + args.duration
+    await asyncio.gather(*[client_loop(n, until, True) for n in range(args.concurrency)])
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run(args, base_url):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        await wait_ready(client, args.startup_timeout)
+        latencies, errors, seconds = await drive(client, args, args.mix)
+
+    summaries = [summarize("chat/all", [t for kind in latencies.values() for t in kind], seconds,
+                           sum(errors.values()))]
+    for kind in args.mix:
+        if latencies[kind] or errors[kind]:
+            summaries.append(summarize(f"chat/{kind}", latencies[kind], seconds, errors[kind]))
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="load this server instead of starting one (and the fake Ollama)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before the run")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--cache", action="store_true", help="leave the server's response cache on")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra server setting, e.g. --env LLM_MAX_CONCURRENCY=8 (repeatable)")
+    parser.add_argument("--first-token-ms", type=float, default=100.0, help="fake Ollama time to first token")
+    parser.add_argument("--token-ms", type=float, default=10.0, help="fake Ollama delay per further token")
+    add_arguments(parser, min_delta_ms=5.0)
+    args = parser.parse_args()
+
+    if args.url:
+        summaries = asyncio.run(run(args, args.url))
+    else:
+        from bench_startup import free_port
+
+        extra_env = dict(item.split("=", 1) for item in args.env)
+        port = free_port()
+        with FakeOllama(first_token_ms=args.first_token_ms, token_ms=args.token_ms, seed=args.seed) as fake:
+            server = start_server(port, fake.url, args.cache, extra_env)
+            try:
+                summaries = asyncio.run(run(args, f"http://127.0.0.1:{port}"))
+            finally:
+                server.terminate()
+                server.wait(timeout=10)
+            print(f"fake Ollama: {fake.stats()['requests']} model calls, "
+                  f"at most {fake.stats()['max_in_flight']} at once")
+
+    print(f"\n/api/chat, {args.concurrency} clients, {args.duration:.0f}s")
+    print_table(summaries)
+    sys.exit(finish(args, summaries))
+
+
+if __name__ == "__main__":
+    main()
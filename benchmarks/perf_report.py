@@ -0,0 +1,119 @@
+"""Latency summaries, baselines and regression checks shared by load_chat.py and bench_chat_paths.py.
+
+A run is a list of Summary rows (one per scenario). `--save-baseline FILE`
+stores them as JSON; `--baseline FILE` compares the run against a stored one
+and `finish` returns exit status 1 if any scenario got slower than the
+tolerance allows (p50/p95/p99 up, throughput down, or more errors).
+Latency changes smaller than `--min-delta-ms` are ignored so scheduler noise
+on sub-millisecond paths does not fail a run.
+"""
+import argparse
+import json
+import math
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Sequence
+
+LATENCY_FIELDS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+class Summary(NamedTuple):
+    name: str
+    count: int
+    errors: int
+    seconds: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    rps: float
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile of already sorted values; `q` in [0, 100]."""
+    if not ordered:
+        return math.nan
+    pos = (len(ordered) - 1) * q / 100.0
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summarize(name: str, latencies: Iterable[float], seconds: float, errors: int = 0) -> Summary:
+    """Summary of per-request latencies (seconds) completed over `seconds` of wall time."""
+    ordered = sorted(latencies)
+    count = len(ordered) + errors
+    return Summary(
+        name=name,
+        count=count,
+        errors=errors,
+        seconds=seconds,
+        p50_ms=percentile(ordered, 50) * 1000,
+        p95_ms=percentile(ordered, 95) * 1000,
+        p99_ms=percentile(ordered, 99) * 1000,
+        rps=len(ordered) / seconds if seconds > 0 else 0.0,
+    )
+
+
+def print_table(summaries: Iterable[Summary], unit: str = "req/s"):
+    print(f"{'scenario':<22}  {'count':>7}  {'errors':>6}  {'p50 (ms)':>9}  {'p95 (ms)':>9}  {'p99 (ms)':>9}"
+          f"  {unit:>10}")
+    for s in summaries:
+        print(f"{s.name:<22}  {s.count:>7}  {s.errors:>6}  {s.p50_ms:>9.3f}  {s.p95_ms:>9.3f}  {s.p99_ms:>9.3f}"
+              f"  {s.rps:>10.1f}")
+
+
+# ----------------- Baselines -----------------
+def save_baseline(path: Path, summaries: Iterable[Summary]):
+    data = {"scenarios": {s.name: s._asdict() for s in summaries}}
+    Path(path).write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> Dict[str, Summary]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {name: Summary(**row) for name, row in data.get("scenarios", {}).items()}
+
+
+def compare(summaries: Iterable[Summary], baseline: Dict[str, Summary], tolerance: float,
+            min_delta_ms: float = 0.0) -> List[str]:
+    """One line per regression; scenarios missing from either side are skipped, not failed."""
+    regressions = []
+    for s in summaries:
+        base = baseline.get(s.name)
+        if base is None:
+            continue
+        for field in LATENCY_FIELDS:
+            now, before = getattr(s, field), getattr(base, field)
+            if before > 0 and now > before * (1 + tolerance) and now - before > min_delta_ms:
+                regressions.append(f"{s.name}: {field} {before:.3f} -> {now:.3f} (+{now / before - 1:.0%})")
+        if base.rps > 0 and s.rps < base.rps * (1 - tolerance):
+            regressions.append(f"{s.name}: rps {base.rps:.1f} -> {s.rps:.1f} ({s.rps / base.rps - 1:.0%})")
+        error_rate = s.errors / s.count if s.count else 0.0
+        base_rate = base.errors / base.count if base.count else 0.0
+        if error_rate > base_rate + 0.01:
+            regressions.append(f"{s.name}: error rate {base_rate:.1%} -> {error_rate:.1%}")
+    return regressions
+
+
+def add_arguments(parser: argparse.ArgumentParser, tolerance: float = 0.25, min_delta_ms: float = 0.0):
+    parser.add_argument("--baseline", type=Path, help="compare against this baseline and exit 1 on a regression")
+    parser.add_argument("--save-baseline", type=Path, help="write this run's results as a baseline")
+    parser.add_argument("--tolerance", type=float, default=tolerance,
+                        help=f"allowed relative slowdown before a regression (default {tolerance})")
+    parser.add_argument("--min-delta-ms", type=float, default=min_delta_ms,
+                        help=f"ignore latency increases smaller than this (default {min_delta_ms})")
+
+
+def finish(args: argparse.Namespace, summaries: List[Summary]) -> int:
+    """Apply --save-baseline / --baseline; returns the process exit status."""
+    if args.save_baseline:
+        save_baseline(args.save_baseline, summaries)
+        print(f"\nbaseline written to {args.save_baseline}")
+    if not args.baseline:
+        return 0
+    regressions = compare(summaries, load_baseline(args.baseline), args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nno regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
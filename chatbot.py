@@ -2,67 +2,75 @@ import os
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
-from agno.agent import Agent
-from typing import Dict, Optional, Tuple, Any, List
-from transformers import pipeline
-import concurrent.futures
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Any, List, AsyncIterator
+import asyncio
+import time
 import logging
 import random
-import json
-import re
 from pathlib import Path
 
-# ----------------- Logging -----------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[logging.FileHandler("chatbot.log"), logging.StreamHandler()]
+from intent_cascade import IntentCascade
+from intent_engine import IntentEngine, IntentModelUnavailable
+from llm_executor import LLMExecutor, LLMTimeout
+from log_pipeline import setup_logging
+from metrics import (
+    CACHE_TOTAL, INTENT_FALLBACK_TOTAL, INTENT_TOTAL, REPLY_TOTAL, RISK_TOTAL, STAGE_SECONDS, annotate, stage, traced,
 )
-logger = logging.getLogger(__name__)
+from admission import AdmissionController
+from counsellor_index import Counsellor, CounsellorIndex, RankQuery
+from phrase_matcher import RiskMatch, RiskMatcher, WatchedJSON
+from rules_engine import RuleSet
+from session_store import make_session_store
+from response_cache import make_response_cache
 
-# ----------------- Ollama -----------------
-try:
-    from agno.models.ollama import Ollama
-except ImportError:
-    from agno.models.ollama.chat import Ollama
+if TYPE_CHECKING:
+    from agno.agent import Agent
+
+# ----------------- Logging -----------------
+# Queue-backed, rotating JSON logs written off the request path; see log_pipeline.py for LOG_* settings
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # ----------------- Session Store -----------------
-sessions: Dict[str, Dict[str, Optional[str]]] = {}
+# Bounded and expiring; SESSION_BACKEND=sqlite shares sessions across uvicorn workers
+session_store = make_session_store()
 
 # ----------------- Distress Dataset -----------------
+# Filled when distress_words.json is first read, on the first risk check or in preload()
 distress_words_cache: Dict[str, List[str]] = {"high_risk": [], "medium_risk": []}
 
+def data_file_candidates(filename: str) -> List[Path]:
+    return [
+        Path("data") / filename,
+        Path(".") / filename,
+        Path(os.path.dirname(__file__)) / "data" / filename,
+    ]
+
+def _build_risk_matcher(data: Dict[str, List[str]]) -> RiskMatcher:
+    global distress_words_cache
+    matcher = RiskMatcher.from_dict(data)
+    distress_words_cache = matcher.words
+    return matcher
+
+# Swapped for a freshly compiled matcher whenever distress_words.json changes on disk
+risk_matcher = WatchedJSON(
+    data_file_candidates("distress_words.json"),
+    build=_build_risk_matcher,
+    default=lambda: RiskMatcher([], []),
+)
+
 def load_distress_words() -> Dict[str, List[str]]:
     """Load distress words from JSON."""
-    global distress_words_cache
-    try:
-        possible_paths = [
-            Path("data/distress_words.json"),
-            Path("./distress_words.json"),
-            Path(os.path.dirname(__file__)) / "data" / "distress_words.json",
-        ]
-        dataset_path = None
-        for path in possible_paths:
-            if path.exists():
-                dataset_path = path
-                break
-        if not dataset_path:
-            logger.warning("No distress_words.json found")
-            return {"high_risk": [], "medium_risk": []}
-
-        with open(dataset_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        distress_words_cache = {
-            "high_risk": [w.lower() for w in data.get("high_risk", [])],
-            "medium_risk": [w.lower() for w in data.get("medium_risk", [])],
-        }
-        return distress_words_cache
-    except Exception as e:
-        logger.error(f"Failed to load distress dataset: {e}")
-        return {"high_risk": [], "medium_risk": []}
+    return risk_matcher.reload().words
+
 
-distress_words_cache = load_distress_words()
+# ----------------- Quick Response Rules -----------------
+# Canned replies and fallback intent keywords; edits to the JSON apply without a restart
+quick_rules = WatchedJSON(
+    data_file_candidates("quick_responses.json"),
+    build=RuleSet.from_dict,
+    default=lambda: RuleSet([], []),
+)
 
 
 # ----------------- Coping Techniques -----------------
@@ -91,18 +99,25 @@ def get_fallback_response() -> str:
     return random.choice(FALLBACK_RESPONSES)
 
 # ----------------- Risk Detection -----------------
+def scan_risk(text: str) -> RiskMatch:
+    """Return the risk tier and every distress phrase found, in one pass over the text."""
+    return risk_matcher.get().scan(text)
+
 def classify_risk(text: str) -> str:
-    text_lower = text.lower()
-    for word in distress_words_cache.get("high_risk", []):
-        if re.search(rf"\b{re.escape(word)}\b", text_lower):
-            return "high"
-    for word in distress_words_cache.get("medium_risk", []):
-        if re.search(rf"\b{re.escape(word)}\b", text_lower):
-            return "medium"
-    return "low"
+    return scan_risk(text).tier
 
 # ----------------- Agent -----------------
+# agno is most of chatbot's import time, so it is only imported once an agent is needed (or in preload())
+def _agent_classes():
+    from agno.agent import Agent
+    try:
+        from agno.models.ollama import Ollama
+    except ImportError:
+        from agno.models.ollama.chat import Ollama
+    return Agent, Ollama
+
 def make_agent():
+    Agent, Ollama = _agent_classes()
     try:
         model = Ollama(id="llama3.2", options={
             "temperature": 0.2,
@@ -128,135 +143,469 @@ def make_agent():
     )
 
 # ----------------- Timeout Wrapper -----------------
-def run_with_timeout(agent, query, max_tokens=30, timeout=8):
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future = executor.submit(agent.run, query, max_tokens=max_tokens)
+# Shared by every request in the process; bounds concurrent generations (LLM_MAX_CONCURRENCY)
+llm_executor = LLMExecutor()
+
+# Replies for repeat messages; fallbacks from timeouts are never stored
+response_cache = make_response_cache()
+
+def response_cache_key(agent, message: str, risk: str) -> Optional[str]:
+    """Cache key for a model reply, or None when the message must not be cached."""
+    if risk == "high" or not response_cache.enabled:
+        return None
+    model = getattr(agent, "model", None)
+    model_id = getattr(model, "id", None) or type(agent).__name__
+    return response_cache.key(message, model_id, getattr(model, "options", None), getattr(agent, "instructions", None))
+
+# Sheds model calls up front when the queue is too long to answer within ADMISSION_QUEUE_BUDGET
+admission = AdmissionController(limit=llm_executor.max_concurrency)
+
+def get_shed_response() -> str:
+    """Immediate reply for a message the model can't take right now."""
+    if random.random() < 0.5:
+        return get_fallback_response()
+    return f"I'm here with you. While you gather your thoughts, try this: {suggest_coping()}."
+
+def cached_reply(cache_key: str) -> Optional[str]:
+    cached = response_cache.get(cache_key)
+    CACHE_TOTAL.inc(result="miss" if cached is None else "hit")
+    if cached is not None:
+        REPLY_TOTAL.inc(source="cache")
+    return cached
+
+class _ModelCall:
+    """Everything around one model call except the call itself: cache, admission, release, reply metrics.
+
+    On entry `reply` is set if no model call is needed (cache hit or shed).
+    Leaving the block releases the admission ticket, on errors and
+    cancellation too, with the generation time as the service-time sample.
+    """
+
+    def __init__(self, cache_key: Optional[str], risk: str = "low"):
+        self.cache_key = cache_key
+        self.risk = risk
+        self.source: Optional[str] = None  # "cache" or "shed" when `reply` is set on entry
+        self.reply: Optional[str] = None
+        self.ticket = None
+        self.started = 0.0
+        self._generated: List[float] = []
+
+    def __enter__(self) -> "_ModelCall":
+        if self.cache_key:
+            self.reply = cached_reply(self.cache_key)
+            if self.reply is not None:
+                self.source = "cache"
+                return self
+        self.ticket = admission.try_admit(self.risk)
+        if self.ticket is None:
+            logger.warning("Model backend saturated, shedding request")
+            REPLY_TOTAL.inc(source="shed")
+            self.source, self.reply = "shed", get_shed_response()
+            return self
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.ticket is not None:
+            admission.release(self.ticket, self._generated[0] if self._generated else None)
+            self.ticket = None
+        return False
+
+    @property
+    def priority(self) -> bool:
+        return self.ticket.bypass
+
+    def on_generated(self, seconds: float):
+        self._generated.append(seconds)
+
+    def timed_out(self) -> str:
+        """Count the timeout; returns the fallback reply."""
+        logger.warning("Agent timeout, using fallback response")
+        REPLY_TOTAL.inc(source="timeout")
+        return get_fallback_response()
+
+    def succeeded(self, text: str):
+        REPLY_TOTAL.inc(source="model")
+        if self.cache_key:
+            response_cache.put(self.cache_key, text, time.perf_counter() - self.started)
+
+def run_with_timeout(agent, query, max_tokens=30, timeout=8, cache_key=None, risk="low"):
+    with _ModelCall(cache_key, risk) as call:
+        if call.reply is not None:
+            return call.reply
+        try:
+            with stage("llm"):
+                response = llm_executor.run(agent, query, max_tokens=max_tokens, timeout=timeout,
+                                            priority=call.priority, on_generated=call.on_generated)
+        except LLMTimeout:
+            return call.timed_out()
+        call.succeeded(_reply_text(response))
+        return response
+
+async def arun_with_timeout(agent, query, max_tokens=30, timeout=8, cache_key=None, risk="low"):
+    """Async model call; at the deadline the generation is cancelled and a fallback returned."""
+    with _ModelCall(cache_key, risk) as call:
+        if call.reply is not None:
+            return call.reply
         try:
-            return future.result(timeout=timeout)
-        except concurrent.futures.TimeoutError:
-            logger.warning("Agent timeout, using fallback response")
-            return get_fallback_response()
+            with stage("llm"):
+                response = await llm_executor.arun(agent, query, max_tokens=max_tokens, timeout=timeout,
+                                                   priority=call.priority, on_generated=call.on_generated)
+        except LLMTimeout:
+            return call.timed_out()
+        call.succeeded(_reply_text(response))
+        return response
+
+# ----------------- Counsellors -----------------
+# One index for the process; edits to counsellors.json are applied to it as a diff
+counsellor_index = CounsellorIndex()
+
+counsellor_roster = WatchedJSON(
+    data_file_candidates("counsellors.json"),
+    build=lambda data: counsellor_index.sync(data.get("counsellors", [])),
+    default=lambda: counsellor_index,
+)
+
+def rank_counsellors(answers: Dict[str, Optional[str]], intent: Optional[str] = None, label: Optional[str] = None,
+                     language: Optional[str] = None, k: int = 10) -> List[Dict[str, Any]]:
+    """Top-k counsellors for questionnaire answers (q1-q3) and a classified intent or its specialization label."""
+    if label is None and intent is not None:
+        label = INTENT_SPECIALIZATIONS.get(intent, "general")
+    query = RankQuery.from_answers(answers, label, language)
+    return [r.to_dict() for r in counsellor_roster.get().rank(query, k)]
 
 # ----------------- Counsellor Payload -----------------
-def make_counsellor_payload() -> Dict[str, Any]:
-    counsellors = [
-        {
-            "id": "crisis_1",
-            "name": "Dr. Sarah Johnson",
-            "specialization": "Crisis Intervention",
-            "affiliation": "Campus Mental Health",
-            "fees": 0,
-            "experience_years": 8,
-            "ranking_score": 9.5,
-            "languages": ["English", "Hindi"],
-            "bio": "Crisis intervention and suicide prevention specialist"
-        },
-        {
-            "id": "crisis_2",
-            "name": "Dr. Raj Patel",
-            "specialization": "Emergency Counseling",
-            "affiliation": "Student Wellness Center",
-            "fees": 0,
-            "experience_years": 12,
-            "ranking_score": 9.8,
-            "languages": ["English", "Hindi", "Gujarati"],
-            "bio": "Trauma counseling and emergency support expert"
-        }
-    ]
+CRISIS_MESSAGE = "**I'm concerned about you.** Here are counsellors who can help right now."
+
+# Served when the roster has no usable crisis counsellor (file missing, broken or without a match)
+CRISIS_FALLBACK_COUNSELLORS = [
+    {
+        "id": "crisis_1",
+        "name": "Dr. Sarah Johnson",
+        "specialization": "Crisis Intervention",
+        "affiliation": "Campus Mental Health",
+        "fees": 0,
+        "experience_years": 8,
+        "ranking_score": 9.5,
+        "languages": ["English", "Hindi"],
+        "bio": "Crisis intervention and suicide prevention specialist",
+    },
+    {
+        "id": "crisis_2",
+        "name": "Dr. Raj Patel",
+        "specialization": "Emergency Counseling",
+        "affiliation": "Student Wellness Center",
+        "fees": 0,
+        "experience_years": 12,
+        "ranking_score": 9.8,
+        "languages": ["English", "Hindi", "Gujarati"],
+        "bio": "Trauma counseling and emergency support expert",
+    },
+]
+
+def _crisis_ready(c: Counsellor) -> bool:
+    """A crisis contact needs every field the chat reply schema requires."""
+    return (c.affiliation is not None and c.fees is not None and c.experience_years is not None
+            and c.rating is not None)
+
+def _build_crisis_settings(data: Dict[str, Any]) -> Dict[str, Any]:
     return {
-        "type": "counsellor_suggestion",
-        "message": "**I'm concerned about you.** Here are counsellors who can help right now.",
-        "counsellors": counsellors
+        "message": data.get("message", CRISIS_MESSAGE),
+        "query": RankQuery(tuple((s, 1.0) for s in data.get("specializations", [])), language=data.get("language")),
+        "top_k": int(data.get("top_k", 2)),
     }
 
+crisis_settings = WatchedJSON(
+    data_file_candidates("crisis_counsellors.json"),
+    build=_build_crisis_settings,
+    default=lambda: _build_crisis_settings({}),
+)
+
+# (settings, index, roster version, payload): rebuilt only when the settings or the roster change
+_crisis_payload: Tuple[Any, Any, int, Optional[Dict[str, Any]]] = (None, None, -1, None)
+
+def make_counsellor_payload() -> Dict[str, Any]:
+    """Crisis counsellors ranked from the roster; every call returns the same dict until the data changes, so never mutate it."""
+    global _crisis_payload
+    index = counsellor_roster.get()
+    settings = crisis_settings.get()
+    cached_settings, cached_index, version, payload = _crisis_payload
+    if payload is None or cached_settings is not settings or cached_index is not index or version != index.version:
+        version = index.version
+        # Only counsellors whose specialization matched a crisis term, never the rest of the roster
+        ranked = index.rank(settings["query"], settings["top_k"], matched_only=True, where=_crisis_ready)
+        counsellors = [r.to_dict() for r in ranked]
+        if not counsellors:
+            logger.warning("No crisis counsellors in the roster, using the built-in contacts")
+            counsellors = CRISIS_FALLBACK_COUNSELLORS
+        payload = {
+            "type": "counsellor_suggestion",
+            "message": settings["message"],
+            "counsellors": counsellors,
+        }
+        _crisis_payload = (settings, index, version, payload)
+    return payload
+
 # ----------------- Intent Classification -----------------
 def classify_intent_fallback(message: str) -> str:
     """Fallback intent classification using keyword matching."""
-    message_lower = message.lower()
-    
-    # Greeting keywords
-    if any(word in message_lower for word in ["hi", "hello", "hey", "good morning", "good evening"]):
-        return "greeting"
-    
-    # Goodbye keywords
-    if any(word in message_lower for word in ["bye", "goodbye", "see you", "take care"]):
-        return "goodbye"
-    
-    # Thanks keywords
-    if any(word in message_lower for word in ["thank", "thanks", "appreciate"]):
-        return "thanks"
-    
-    # Mental health keywords
-    if any(word in message_lower for word in ["stress", "anxiety", "depressed", "worried", "panic", "overwhelmed"]):
-        return "mental_health"
-    
-    return "general"
+    return quick_rules.get().match(message).intent
+
+def _intent_fallback(message: str, error: Exception) -> str:
+    if not isinstance(error, IntentModelUnavailable):
+        logger.warning("Intent classification failed: %s, using fallback", error)
+    intent_cascade.record_fallback()
+    INTENT_FALLBACK_TOTAL.inc()
+    return classify_intent_fallback(message)
+
+# Loaded once per process and shared by every request; see intent_engine.py
+intent_engine = IntentEngine()
+
+# Local nearest-centroid model answers confident cases; the rest go to intent_engine
+intent_cascade = IntentCascade(intent_engine, data_file_candidates("intent_seed.jsonl"))
 
 def classify_intent(message: str) -> str:
     """Classify message intent with fallback."""
     try:
-        classifier = pipeline("zero-shot-classification", model="valhalla/distilbart-mnli-12-1")
-        candidate_labels = ["greeting", "goodbye", "thanks", "mental_health", "study_stress", "exam_anxiety", "personal_issue"]
-        result = classifier(message, candidate_labels)
-        return result["labels"][0]
+        return intent_cascade.classify(message)
+    except Exception as e:
+        return _intent_fallback(message, e)
+
+async def aclassify_intent(message: str) -> str:
+    """Await the intent cascade without tying up the event loop."""
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(intent_cascade.submit(message)), timeout=10)
     except Exception as e:
-        logger.warning(f"Intent classification failed: {e}, using fallback")
-        return classify_intent_fallback(message)
+        return _intent_fallback(message, e)
+
+# ----------------- Text Classification -----------------
+# Keyword the frontend matches against counsellor specializations (src/lib/counsellorRanking.ts)
+INTENT_SPECIALIZATIONS = {
+    "exam_anxiety": "anxiety",
+    "study_stress": "stress",
+    "mental_health": "mental health",
+    "personal_issue": "relationship",
+}
+
+def _classification(text: str, intent: str) -> Dict[str, Any]:
+    risk = scan_risk(text)
+    return {
+        "label": INTENT_SPECIALIZATIONS.get(intent, "general"),
+        "intent": intent,
+        "risk": risk.tier,
+        "matched_phrases": risk.phrases,
+    }
+
+def classify_texts(texts: List[str]) -> List[Dict[str, Any]]:
+    """Risk tier, distress phrases and intent per text; all texts are queued at once so the model sees full batches."""
+    futures = [intent_cascade.submit(text) for text in texts]
+    results = []
+    for text, future in zip(texts, futures):
+        try:
+            intent = future.result(timeout=30)
+        except Exception as e:
+            intent = _intent_fallback(text, e)
+        results.append(_classification(text, intent))
+    return results
+
+async def aclassify_texts(texts: List[str]) -> List[Dict[str, Any]]:
+    intents = await asyncio.gather(*[aclassify_intent(text) for text in texts])
+    return [_classification(text, intent) for text, intent in zip(texts, intents)]
 
 # ----------------- Conversation -----------------
-def process_message(agent: Agent, message: str, session_id: Optional[str] = None):
-    if not message.strip():
-        return "Could you share a bit more about how you're feeling?"
+def quick_reply(message: str) -> Optional[str]:
+    """Canned reply for common queries, or None if the message needs the model."""
+    return quick_rules.get().match(message).reply
+
+def _open_session(message: str, session_id: Optional[str]) -> Dict[str, Optional[str]]:
+    sess = session_store.get(session_id or "default")
 
-    sess = sessions.setdefault(session_id or "default", {"last_topic": None, "last_prompt_key": None})
-    risk = classify_risk(message)
-    
     # Session reset logic
     if sess.get("last_prompt_key") and len(message.split()) > 25:
-        logger.info(f"Session {session_id}: Resetting due to long message after prompt key")
+        logger.info("Session %s: Resetting due to long message after prompt key", session_id,
+                    extra={"session_id": session_id})
         sess["last_prompt_key"] = None
         sess["last_topic"] = None
+        session_store.save(session_id or "default", sess)
+    return sess
 
-    # Log session info
-    intent = classify_intent(message)
-    logger.info(f"Session {session_id}: intent={intent}, risk={risk}, last_topic={sess.get('last_topic')}, last_key={sess.get('last_prompt_key')}")
+# The SQLite store can wait up to its busy timeout on a writer lock, so the async paths run it in a thread
+async def _aopen_session(message: str, session_id: Optional[str]) -> Dict[str, Optional[str]]:
+    if session_store.blocking:
+        return await asyncio.to_thread(_open_session, message, session_id)
+    return _open_session(message, session_id)
+
+async def _asave_session(session_id: Optional[str], sess: Dict[str, Optional[str]]):
+    if session_store.blocking:
+        await asyncio.to_thread(session_store.save, session_id or "default", sess)
+    else:
+        session_store.save(session_id or "default", sess)
+
+def _agent_query(message: str) -> str:
+    return f"Student said: {message}\nRespond as a supportive wellness AI."
+
+def _reply_text(response) -> str:
+    return getattr(response, "content", None) or str(response)
 
+def _record_classification(session_id: Optional[str], sess, intent: str, risk: str):
+    RISK_TOTAL.inc(tier=risk)
+    INTENT_TOTAL.inc(intent=intent)
+    annotate(intent=intent, risk=risk)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Session %s: intent=%s, risk=%s, last_topic=%s, last_key=%s",
+            session_id, intent, risk, sess.get("last_topic"), sess.get("last_prompt_key"),
+            extra={"session_id": session_id, "intent": intent, "risk": risk},
+        )
+
+def _crisis_reply(session_id: Optional[str]) -> Dict[str, Any]:
+    """High-risk fast path: straight from classify_risk to the prebuilt payload, no session, intent model or LLM."""
+    RISK_TOTAL.inc(tier="high")
+    REPLY_TOTAL.inc(source="crisis")
+    annotate(risk="high")
+    logger.info("Session %s: risk=high, sending crisis counsellors", session_id,
+                extra={"session_id": session_id, "risk": "high"})
+    return make_counsellor_payload()
+
+def _early_reply(message: str):
+    """Canned reply, or None if the message needs the model."""
+    with stage("quick_reply"):
+        canned = quick_reply(message)
+    if canned is not None:
+        REPLY_TOTAL.inc(source="canned")
+    return canned
+
+def process_message(agent: "Agent", message: str, session_id: Optional[str] = None):
+    with traced("process_message"):
+        return _process_message(agent, message, session_id)
+
+def _process_message(agent: "Agent", message: str, session_id: Optional[str]):
+    if not message.strip():
+        REPLY_TOTAL.inc(source="empty")
+        return "Could you share a bit more about how you're feeling?"
+
+    with stage("risk"):
+        risk = classify_risk(message)
     if risk == "high":
-        return make_counsellor_payload()
-
-    # Quick responses for common queries
-    message_lower = message.lower().strip()
-    if message_lower in ["hi", "hello", "hey", "good morning", "good evening"]:
-        return "Hello! I'm here to support you. How are you feeling today?"
-    elif message_lower in ["bye", "goodbye", "see you", "take care"]:
-        return "Take care! Remember, I'm here whenever you need support. 💙"
-    elif message_lower in ["thank you", "thanks", "thank you so much"]:
-        return "You're very welcome! I'm glad I could help. Feel free to reach out anytime."
-    elif "anxious" in message_lower or "anxiety" in message_lower or "panic" in message_lower:
-        return "I understand anxiety can be overwhelming. Try taking 3 deep breaths: inhale for 4 counts, hold for 4, exhale for 4. You've got this! 💙"
-    elif "stressed" in message_lower or "stress" in message_lower or "exam" in message_lower:
-        return "Stress is tough to deal with. Try the 5-4-3-2-1 grounding technique: notice 5 things you see, 4 you can touch, 3 you hear, 2 you smell, 1 you taste."
-    elif "sleep" in message_lower or "tired" in message_lower or "insomnia" in message_lower:
-        return "Sleep issues can be frustrating. Try some gentle stretching or listening to calming music before bed. A warm cup of herbal tea might help too."
-    elif "overwhelmed" in message_lower or "overwhelm" in message_lower or "too much" in message_lower:
-        return "Feeling overwhelmed is completely normal. Take it one step at a time. Try breaking tasks into smaller pieces and focus on just one thing right now."
-    elif "sad" in message_lower or "depressed" in message_lower or "down" in message_lower:
-        return "I'm sorry you're feeling this way. Remember that it's okay to not be okay. Try some gentle movement like a short walk, or consider talking to someone you trust."
-    elif "angry" in message_lower or "mad" in message_lower or "frustrated" in message_lower:
-        return "Anger is a valid emotion. Try taking a few deep breaths and counting to 10. Sometimes stepping away for a moment can help you feel more centered."
-    elif "lonely" in message_lower or "alone" in message_lower or "isolated" in message_lower:
-        return "Feeling lonely can be really hard. You're not alone in this feeling. Consider reaching out to a friend, family member, or joining a group activity that interests you."
-    elif "relationship" in message_lower or "boyfriend" in message_lower or "girlfriend" in message_lower:
-        return "Relationship issues can be really challenging. Remember to communicate openly and honestly. It's also important to take care of yourself during difficult times."
+        return _crisis_reply(session_id)
+    with stage("session"):
+        sess = _open_session(message, session_id)
+
+    # Log session info
+    with stage("intent"):
+        intent = classify_intent(message)
+    _record_classification(session_id, sess, intent, risk)
+
+    early = _early_reply(message)
+    if early is not None:
+        return early
 
     # For other messages, try the AI model with shorter timeout
-    query = f"Student said: {message}\nRespond as a supportive wellness AI."
-    response = run_with_timeout(agent, query, max_tokens=30)
+    response = run_with_timeout(
+        agent, _agent_query(message), max_tokens=30, cache_key=response_cache_key(agent, message, risk), risk=risk
+    )
+
+    reply = _reply_text(response)
+    sess["last_topic"] = message
+    session_store.save(session_id or "default", sess)
+    return reply
+
+async def _aprepare(message: str, session_id: Optional[str]):
+    """Shared front half of the async paths: (session, risk, reply-if-no-model-needed)."""
+    if not message.strip():
+        REPLY_TOTAL.inc(source="empty")
+        return None, "low", "Could you share a bit more about how you're feeling?"
+
+    with stage("risk"):
+        risk = classify_risk(message)
+    if risk == "high":
+        return None, risk, _crisis_reply(session_id)
+    with stage("session"):
+        sess = await _aopen_session(message, session_id)
 
-    reply = getattr(response, "content", None) or str(response)
+    with stage("intent"):
+        intent = await aclassify_intent(message)
+    _record_classification(session_id, sess, intent, risk)
+    return sess, risk, _early_reply(message)
+
+async def aprocess_message(agent: "Agent", message: str, session_id: Optional[str] = None):
+    """Async variant of process_message; never blocks the calling event loop."""
+    sess, risk, early = await _aprepare(message, session_id)
+    if early is not None:
+        return early
+
+    response = await arun_with_timeout(
+        agent, _agent_query(message), max_tokens=30, cache_key=response_cache_key(agent, message, risk), risk=risk
+    )
+
+    reply = _reply_text(response)
     sess["last_topic"] = message
+    await _asave_session(session_id, sess)
     return reply
 
+async def astream_message(agent: "Agent", message: str, session_id: Optional[str] = None,
+                          timeout: float = 8) -> AsyncIterator[Dict[str, Any]]:
+    """Streaming variant: yields {"type": "token", "delta"} events, then one {"type": "done", "reply"}.
+
+    Risk checks and canned replies run first exactly as in process_message;
+    only free-text messages reach the model. If the deadline passes before
+    the first token the fallback response is sent instead; if it passes
+    mid-stream the partial reply is finalised and marked truncated.
+    """
+    sess, risk, early = await _aprepare(message, session_id)
+    if early is not None:
+        yield {"type": "done", "reply": early}
+        return
+
+    parts, truncated = [], False
+    with _ModelCall(response_cache_key(agent, message, risk), risk) as call:
+        if call.reply is not None:
+            yield {"type": "token", "delta": call.reply}
+            if call.source == "shed":
+                yield {"type": "done", "reply": call.reply}
+                return
+            parts.append(call.reply)
+        else:
+            try:
+                async for delta in llm_executor.astream(agent, _agent_query(message), max_tokens=30, timeout=timeout,
+                                                        priority=call.priority, on_generated=call.on_generated):
+                    parts.append(delta)
+                    yield {"type": "token", "delta": delta}
+            except LLMTimeout:
+                fallback = call.timed_out()
+                if not parts:
+                    yield {"type": "token", "delta": fallback}
+                    yield {"type": "done", "reply": fallback}
+                    return
+                truncated = True
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - call.started, stage="llm_stream")
+            if not truncated:
+                call.succeeded("".join(parts))
+
+    sess["last_topic"] = message
+    await _asave_session(session_id, sess)
+    yield {"type": "done", "reply": "".join(parts), "truncated": truncated}
+
+
+# ----------------- Startup -----------------
+def preload():
+    """Import agno and load the data files and intent model weights, without starting any threads.
+
+    Safe to call in a parent process that forks workers afterwards: the
+    loaded modules and weights are shared with them copy-on-write.
+    """
+    _agent_classes()
+    risk_matcher.get()
+    quick_rules.get()
+    make_counsellor_payload()
+    intent_cascade.preload()
+
+def warm_up() -> bool:
+    """Per-process warm-up: preload, then one throwaway intent batch. Returns False if the intent model is unavailable."""
+    preload()
+    return intent_cascade.warm_up()
+
 
 if __name__ == "__main__":
     print("PulseBot is running! Type 'quit' to exit.\n")
@@ -0,0 +1,322 @@
+import bisect
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# ----------------- Scoring -----------------
+# Same weights as src/lib/counsellorRanking.ts, so the server and the browser agree on the order
+ANSWER_WEIGHTS = (("q1", 5.0), ("q2", 3.0), ("q3", 2.0))
+CLASSIFIED_WEIGHT = 4.0
+LOCATION_WEIGHT = 2.0
+LOCATION_MARKERS = (("on-campus", "on"), ("off-campus", "off"))
+LANGUAGE_WEIGHT = 1.0
+
+
+def normalize(text: Optional[str]) -> str:
+    return (text or "").lower()
+
+
+def base_score(fees: Optional[int], experience_years: Optional[int]) -> float:
+    """The frontend's smallSignals: experience helps a little, high fees hurt a little."""
+    score = 0.0
+    if (experience_years or 0) >= 5:
+        score += 0.5
+    if fees and fees > 600:
+        score -= 0.25
+    return score
+
+
+class Counsellor(NamedTuple):
+    id: str
+    name: str
+    specialization: str
+    affiliation: Optional[str]
+    fees: Optional[int]
+    experience_years: Optional[int]
+    languages: Tuple[str, ...]
+    bio: str
+    # Stored rating the UI shows next to a star, served as `ranking_score`; ranking never reads it
+    rating: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Counsellor":
+        if not data.get("id"):
+            raise ValueError(f"Counsellor without an id: {data!r}")
+        return cls(
+            id=str(data["id"]),
+            name=str(data.get("name") or "Counsellor"),
+            specialization=str(data.get("specialization") or ""),
+            affiliation=data.get("affiliation"),
+            fees=data.get("fees"),
+            experience_years=data.get("experience_years"),
+            languages=tuple(data.get("languages") or ()),
+            bio=str(data.get("bio") or ""),
+            rating=data.get("ranking_score"),
+        )
+
+
+class RankQuery(NamedTuple):
+    """Specialization terms with their weights, plus the location preference and language to boost."""
+    terms: Tuple[Tuple[str, float], ...] = ()
+    location: Optional[str] = None
+    language: Optional[str] = None
+
+    @classmethod
+    def from_answers(cls, answers: Dict[str, Optional[str]], classified: Optional[str] = None,
+                     language: Optional[str] = None) -> "RankQuery":
+        terms = [(answers[key], weight) for key, weight in ANSWER_WEIGHTS if answers.get(key)]
+        if classified:
+            terms.append((classified, CLASSIFIED_WEIGHT))
+        return cls(tuple(terms), answers.get("q3"), language)
+
+
+class Ranked(NamedTuple):
+    counsellor: Counsellor
+    score: float
+    location_match: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        c = self.counsellor
+        return {
+            "id": c.id,
+            "name": c.name,
+            "specialization": c.specialization or "Mental Health Specialist",
+            "affiliation": c.affiliation,
+            "location_match": self.location_match,
+            "ranking_score": c.rating,
+            "score": round(self.score, 2),
+            "fees": c.fees,
+            "experience_years": c.experience_years,
+            "languages": list(c.languages),
+            "bio": c.bio,
+        }
+
+
+# ----------------- Index -----------------
+OrderKey = Tuple[float, int, int, str]
+
+
+class _SubstringIndex:
+    """Presorted postings per key, looked up by substring the way the frontend's `includes` matches.
+
+    A lookup scans the distinct keys (specializations, affiliations), not
+    the counsellors, and the keys that matched are cached until a key is
+    added or disappears. Questionnaire answers come from a small fixed set,
+    so in steady state a lookup is a dict hit; the cache is an LRU of
+    `cache_size` needles because clients can send any text.
+    """
+
+    def __init__(self, cache_size: int = 256):
+        self.postings: Dict[str, List[OrderKey]] = {}
+        self.cache_size = cache_size
+        self._matches: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+
+    def add(self, key: str, entry: OrderKey):
+        entries = self.postings.get(key)
+        if entries is None:
+            entries = self.postings[key] = []
+            self._matches.clear()
+        bisect.insort(entries, entry)
+
+    def discard(self, key: str, entry: OrderKey):
+        entries = self.postings.get(key)
+        if entries is None:
+            return
+        _remove_sorted(entries, entry)
+        if not entries:
+            del self.postings[key]
+            self._matches.clear()
+
+    def keys_containing(self, needle: str) -> Tuple[str, ...]:
+        keys = self._matches.get(needle)
+        if keys is not None:
+            self._matches.move_to_end(needle)
+            return keys
+        keys = self._matches[needle] = tuple(k for k in self.postings if needle in k)
+        if len(self._matches) > self.cache_size:
+            self._matches.popitem(last=False)
+        return keys
+
+
+def _remove_sorted(entries: List[OrderKey], entry: OrderKey):
+    i = bisect.bisect_left(entries, entry)
+    if i < len(entries) and entries[i] == entry:
+        del entries[i]
+
+
+class CounsellorIndex:
+    """In-memory counsellor roster with the indexes ranking needs.
+
+    Every counsellor has an order key for the query-independent part of the
+    ranking (base score, experience, fees, id). The whole roster and each
+    distinct specialization, affiliation and language keep their
+    counsellors presorted by it. A query's bonuses are the same for
+    everyone sharing a specialization, affiliation or language, so `rank`
+    walks those lists best-first and leaves each one as soon as nothing
+    further down it can beat the current k-th result. The cost follows k
+    and the number of matching groups, not the roster size. `sync` applies
+    a new roster as a diff: unchanged counsellors are not touched.
+    """
+
+    def __init__(self, counsellors: Iterable[Counsellor] = ()):
+        self._lock = threading.RLock()
+        self._by_id: Dict[str, Counsellor] = {}
+        self._keys: Dict[str, OrderKey] = {}
+        self._specialization_of: Dict[str, str] = {}
+        self._affiliation_of: Dict[str, str] = {}
+        self._languages_of: Dict[str, Set[str]] = {}
+        self._specializations = _SubstringIndex()
+        self._affiliations = _SubstringIndex()
+        self._languages: Dict[str, List[OrderKey]] = {}
+        self._order: List[OrderKey] = []
+        self.version = 0
+        for c in counsellors:
+            self.upsert(c)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CounsellorIndex":
+        return cls(Counsellor.from_dict(c) for c in data.get("counsellors", []))
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, cid: str) -> Optional[Counsellor]:
+        return self._by_id.get(cid)
+
+    # -- updates --
+    @staticmethod
+    def _order_key(c: Counsellor) -> OrderKey:
+        return (-base_score(c.fees, c.experience_years), -(c.experience_years or 0), c.fees or 0, c.id)
+
+    def upsert(self, c: Counsellor):
+        with self._lock:
+            old = self._by_id.get(c.id)
+            if old == c:
+                return
+            if old is not None:
+                self._unindex(old)
+            self._index(c)
+            self.version += 1
+
+    def remove(self, cid: str) -> bool:
+        with self._lock:
+            old = self._by_id.get(cid)
+            if old is None:
+                return False
+            self._unindex(old)
+            self.version += 1
+            return True
+
+    def sync(self, records: Iterable[Dict[str, Any]]) -> "CounsellorIndex":
+        """Make the roster equal to `records`; a bad record raises before anything changes."""
+        incoming = {c.id: c for c in (Counsellor.from_dict(r) for r in records)}
+        with self._lock:
+            for cid in [cid for cid in self._by_id if cid not in incoming]:
+                self.remove(cid)
+            for c in incoming.values():
+                self.upsert(c)
+        return self
+
+    def _index(self, c: Counsellor):
+        key = self._order_key(c)
+        specialization = normalize(c.specialization)
+        affiliation = normalize(c.affiliation)
+        languages = {normalize(language) for language in c.languages}
+        self._by_id[c.id] = c
+        self._keys[c.id] = key
+        self._specialization_of[c.id] = specialization
+        self._affiliation_of[c.id] = affiliation
+        self._languages_of[c.id] = languages
+        self._specializations.add(specialization, key)
+        self._affiliations.add(affiliation, key)
+        for language in languages:
+            bisect.insort(self._languages.setdefault(language, []), key)
+        bisect.insort(self._order, key)
+
+    def _unindex(self, c: Counsellor):
+        key = self._keys.pop(c.id)
+        del self._by_id[c.id]
+        self._specializations.discard(self._specialization_of.pop(c.id), key)
+        self._affiliations.discard(self._affiliation_of.pop(c.id), key)
+        for language in self._languages_of.pop(c.id):
+            entries = self._languages[language]
+            _remove_sorted(entries, key)
+            if not entries:
+                del self._languages[language]
+        _remove_sorted(self._order, key)
+
+    # -- queries --
+    def rank(self, query: RankQuery, k: int = 10, matched_only: bool = False,
+             where: Optional[Callable[[Counsellor], bool]] = None) -> List[Ranked]:
+        """Top k for `query`; `matched_only` drops anyone no term matched, `where` filters candidates."""
+        with self._lock:
+            matched: Dict[str, float] = {}
+            for text, weight in query.terms:
+                term = normalize(text)
+                if term:
+                    for specialization in self._specializations.keys_containing(term):
+                        matched[specialization] = matched.get(specialization, 0.0) + weight
+
+            located: Dict[str, float] = {}
+            preference = normalize(query.location)
+            for wanted, marker in LOCATION_MARKERS:
+                if wanted in preference:
+                    for affiliation in self._affiliations.keys_containing(marker):
+                        located[affiliation] = located.get(affiliation, 0.0) + LOCATION_WEIGHT
+
+            language = normalize(query.language) or None
+            language_bonus = LANGUAGE_WEIGHT if language else 0.0
+
+            def speaks(cid: str) -> bool:
+                return language in self._languages_of[cid]
+
+            top: List[OrderKey] = []
+
+            def walk(ordered: Iterable[OrderKey], most: float, keep):
+                # `most` bounds the bonus of anyone in `ordered`, so once even that can't beat the k-th, stop
+                for key in ordered:
+                    if len(top) >= k and (key[0] - most,) + key[1:] >= top[-1]:
+                        return
+                    cid = key[3]
+                    if not keep(cid) or (where is not None and not where(self._by_id[cid])):
+                        continue
+                    bonus = matched.get(self._specialization_of[cid], 0.0)
+                    bonus += located.get(self._affiliation_of[cid], 0.0)
+                    if language and speaks(cid):
+                        bonus += language_bonus
+                    entry = (key[0] - bonus,) + key[1:]
+                    if len(top) < k or entry < top[-1]:
+                        bisect.insort(top, entry)
+                        del top[k:]
+
+            # Each counsellor is scored from exactly one list: its specialization's if a term matched it,
+            # else its affiliation's if located, else its language's, else the whole roster's
+            most_located = max(located.values(), default=0.0)
+            for specialization, bonus in sorted(matched.items(), key=lambda item: -item[1]):
+                walk(self._specializations.postings[specialization], bonus + most_located + language_bonus,
+                     lambda cid: True)
+            if not matched_only:
+                for affiliation, bonus in located.items():
+                    walk(self._affiliations.postings[affiliation], bonus + language_bonus,
+                         lambda cid: self._specialization_of[cid] not in matched)
+                if language:
+                    walk(self._languages.get(language, ()), language_bonus,
+                         lambda cid: self._specialization_of[cid] not in matched
+                         and self._affiliation_of[cid] not in located)
+                walk(self._order, 0.0,
+                     lambda cid: self._specialization_of[cid] not in matched
+                     and self._affiliation_of[cid] not in located and not (language and speaks(cid)))
+
+            return [
+                Ranked(self._by_id[cid], -neg_score, self._affiliation_of[cid] in located)
+                for neg_score, _, _, cid in top
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "counsellors": len(self._by_id),
+            "specializations": len(self._specializations.postings),
+            "affiliations": len(self._affiliations.postings),
+            "languages": len(self._languages),
+            "version": self.version,
+        }
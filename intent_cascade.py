@@ -0,0 +1,171 @@
+import json
+import math
+import os
+import re
+import threading
+import zlib
+import logging
+from collections import defaultdict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+# ----------------- Features -----------------
+def hashed_features(text: str, dim: int = 1 << 18) -> Dict[int, float]:
+    """L2-normalised bag of word unigrams, word bigrams and char trigrams, hashed into `dim` buckets."""
+    words = _TOKEN.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"^{word}$"
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    counts: Dict[int, float] = defaultdict(float)
+    for gram in grams:
+        # crc32 rather than hash(): stable across processes and restarts
+        counts[zlib.crc32(gram.encode("utf-8")) % dim] += 1.0
+    norm = math.sqrt(sum(v * v for v in counts.values()))
+    return {k: v / norm for k, v in counts.items()} if norm else {}
+
+
+class Prediction(NamedTuple):
+    label: str
+    confidence: float
+
+
+# ----------------- Stage 1: Nearest Centroid -----------------
+class CentroidIntentModel:
+    """Nearest-centroid classifier over hashed n-gram features; microseconds per message, CPU only.
+
+    Confidence is the softmax probability of the best label over the
+    cosine similarities scaled by `temperature`.
+    """
+
+    def __init__(self, centroids: Dict[str, Dict[int, float]], temperature: float = 12.0):
+        self.centroids = centroids
+        self.labels = list(centroids)
+        self.temperature = temperature
+
+    @classmethod
+    def train(cls, examples: Iterable[Tuple[str, str]], temperature: float = 12.0) -> "CentroidIntentModel":
+        sums: Dict[str, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        for text, label in examples:
+            for k, v in hashed_features(text).items():
+                sums[label][k] += v
+        centroids = {}
+        for label, vec in sums.items():
+            norm = math.sqrt(sum(v * v for v in vec.values()))
+            centroids[label] = {k: v / norm for k, v in vec.items()} if norm else {}
+        return cls(centroids, temperature)
+
+    @classmethod
+    def from_jsonl(cls, path: Path, **kwargs) -> "CentroidIntentModel":
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return cls.train(((r["text"], r["label"]) for r in rows), **kwargs)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        features = hashed_features(text)
+        return {
+            label: sum(v * centroid.get(k, 0.0) for k, v in features.items())
+            for label, centroid in self.centroids.items()
+        }
+
+    def predict(self, text: str) -> Prediction:
+        scores = self.scores(text)
+        if not scores:
+            return Prediction("general", 0.0)
+        top = max(scores.values())
+        weights = {label: math.exp(self.temperature * (s - top)) for label, s in scores.items()}
+        label = max(weights, key=weights.get)
+        return Prediction(label, weights[label] / sum(weights.values()))
+
+
+# ----------------- Cascade -----------------
+class IntentCascade:
+    """Tiered intent classification: cheap local model first, zero-shot model only when unsure.
+
+    Stage 1 answers when its confidence is at least `threshold`
+    (INTENT_CASCADE_THRESHOLD). Everything else goes to the batched
+    zero-shot engine; if that is unavailable the caller's keyword
+    fallback decides.
+    """
+
+    def __init__(self, engine, seed_paths: Sequence[Path], threshold: Optional[float] = None,
+                 fast_model: Optional[CentroidIntentModel] = None):
+        self.engine = engine
+        self.seed_paths = list(seed_paths)
+        if threshold is None:
+            threshold = float(os.environ.get("INTENT_CASCADE_THRESHOLD", "0.6"))
+        self.threshold = threshold
+        self._fast = fast_model
+        self._fast_lock = threading.Lock()
+        self._fast_failed = False
+        self._hits = {"fast": 0, "model": 0, "fallback": 0}
+
+    def _fast_model(self) -> Optional[CentroidIntentModel]:
+        if self._fast is not None or self._fast_failed:
+            return self._fast
+        with self._fast_lock:
+            if self._fast is None and not self._fast_failed:
+                path = next((p for p in self.seed_paths if p.exists()), None)
+                try:
+                    if path is None:
+                        raise FileNotFoundError("no intent seed set found")
+                    self._fast = CentroidIntentModel.from_jsonl(path)
+                except Exception as e:
+                    self._fast_failed = True
+                    logger.warning("Fast intent model unavailable, every message goes to zero-shot: %s", e)
+        return self._fast
+
+    def fast_predict(self, message: str) -> Optional[str]:
+        """Stage-1 label if it is confident enough, else None."""
+        model = self._fast_model()
+        if model is None or self.threshold > 1.0:
+            return None
+        prediction = model.predict(message)
+        if prediction.confidence >= self.threshold:
+            self._hits["fast"] += 1
+            return prediction.label
+        return None
+
+    def submit(self, message: str) -> Future:
+        """Future resolving to the label; stage 1 resolves it immediately when confident."""
+        label = self.fast_predict(message)
+        if label is not None:
+            future: Future = Future()
+            future.set_result(label)
+            return future
+        future = self.engine.submit(message)
+        future.add_done_callback(self._count_model)
+        return future
+
+    def classify(self, message: str, timeout: Optional[float] = 10.0) -> str:
+        return self.submit(message).result(timeout=timeout)
+
+    def record_fallback(self):
+        self._hits["fallback"] += 1
+
+    def _count_model(self, future: Future):
+        if not future.cancelled() and future.exception() is None:
+            self._hits["model"] += 1
+
+    def preload(self) -> bool:
+        self._fast_model()
+        return self.engine.load()
+
+    def warm_up(self) -> bool:
+        self._fast_model()
+        return self.engine.warm_up()
+
+    def stats(self) -> Dict[str, Any]:
+        total = sum(self._hits.values())
+        return {
+            "threshold": self.threshold,
+            "stage_hits": dict(self._hits),
+            "stage_hit_rates": {k: (v / total if total else 0.0) for k, v in self._hits.items()},
+            "zero_shot": self.engine.stats(),
+        }
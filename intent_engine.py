@@ -0,0 +1,206 @@
+import os
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+# ----------------- Settings -----------------
+INTENT_MODEL = "valhalla/distilbart-mnli-12-1"
+CANDIDATE_LABELS = ["greeting", "goodbye", "thanks", "mental_health", "study_stress", "exam_anxiety", "personal_issue"]
+HYPOTHESIS_TEMPLATE = "This example is {}."
+
+
+class IntentModelUnavailable(RuntimeError):
+    """Raised when the zero-shot model could not be loaded in this process."""
+
+
+# ----------------- Zero-shot Backend -----------------
+class ZeroShotBackend:
+    """distilbart-MNLI scorer with the label hypotheses tokenized once at load time.
+
+    Mirrors the transformers zero-shot pipeline (single-label mode): every
+    premise is paired with every hypothesis, the entailment logits are
+    softmaxed across labels. The whole micro-batch goes through one forward pass.
+    """
+
+    def __init__(self, model_name: str = INTENT_MODEL, labels: Optional[List[str]] = None,
+                 template: str = HYPOTHESIS_TEMPLATE):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self.torch = torch
+        self.labels = list(labels or CANDIDATE_LABELS)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+
+        self.entailment_id = -1
+        for label, idx in self.model.config.label2id.items():
+            if label.lower().startswith("entail"):
+                self.entailment_id = int(idx)
+
+        self.hypothesis_ids = [
+            self.tokenizer(template.format(label), add_special_tokens=False)["input_ids"]
+            for label in self.labels
+        ]
+        longest_hypothesis = max(len(ids) for ids in self.hypothesis_ids)
+        max_length = min(getattr(self.tokenizer, "model_max_length", 512) or 512, 1024)
+        self.max_premise_length = max_length - longest_hypothesis - 4
+
+    def score(self, messages: List[str]) -> List[List[float]]:
+        premise_ids = self.tokenizer(
+            messages, add_special_tokens=False, truncation=True, max_length=self.max_premise_length
+        )["input_ids"]
+        rows = [
+            self.tokenizer.build_inputs_with_special_tokens(premise, hypothesis)
+            for premise in premise_ids
+            for hypothesis in self.hypothesis_ids
+        ]
+        width = max(len(r) for r in rows)
+        pad_id = self.tokenizer.pad_token_id
+        input_ids = self.torch.tensor([r + [pad_id] * (width - len(r)) for r in rows])
+        attention_mask = self.torch.tensor([[1] * len(r) + [0] * (width - len(r)) for r in rows])
+
+        with self.torch.inference_mode():
+            logits = self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+        entailment = logits[:, self.entailment_id].reshape(len(messages), len(self.labels))
+        return entailment.softmax(dim=-1).tolist()
+
+
+# ----------------- Intent Engine -----------------
+class IntentEngine:
+    """Process-resident intent classifier that coalesces concurrent calls into micro-batches.
+
+    The model is loaded once (on `warm_up()` or the first request). Messages
+    submitted within `max_wait_ms` of each other are scored together, up to
+    `batch_size` per forward pass.
+    """
+
+    def __init__(self, labels: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                 max_wait_ms: Optional[float] = None,
+                 backend_factory: Optional[Callable[[], Any]] = None):
+        self.labels = list(labels or CANDIDATE_LABELS)
+        self.batch_size = max(1, batch_size or int(os.environ.get("INTENT_BATCH_SIZE", "16")))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.environ.get("INTENT_MAX_WAIT_MS", "5"))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._backend_factory = backend_factory or (lambda: ZeroShotBackend(labels=self.labels))
+
+        self._backend = None
+        self._load_error: Optional[BaseException] = None
+        self._load_lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._batches = 0
+        self._messages = 0
+
+    # -- lifecycle --
+    def _load_backend(self):
+        if self._backend is not None:
+            return self._backend
+        if self._load_error is not None:
+            raise IntentModelUnavailable(str(self._load_error))
+        with self._load_lock:
+            if self._backend is None and self._load_error is None:
+                started = time.perf_counter()
+                try:
+                    self._backend = self._backend_factory()
+                    logger.info("Intent model loaded in %.2fs", time.perf_counter() - started)
+                except Exception as e:
+                    self._load_error = e
+                    logger.warning("Intent model unavailable, keyword fallback will be used: %s", e)
+        if self._backend is None:
+            raise IntentModelUnavailable(str(self._load_error))
+        return self._backend
+
+    def load(self) -> bool:
+        """Load the model weights without running them or starting the batcher. Returns False if unavailable."""
+        try:
+            self._load_backend()
+            return True
+        except IntentModelUnavailable:
+            return False
+
+    def warm_up(self) -> bool:
+        """Load the model and run one throwaway batch. Returns False if the model is unavailable."""
+        try:
+            self._load_backend().score(["hello"])
+            return True
+        except Exception as e:
+            logger.warning("Intent model warm-up failed: %s", e)
+            return False
+
+    @property
+    def available(self) -> bool:
+        return self._backend is not None
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="intent-batcher", daemon=True)
+                self._worker.start()
+
+    # -- public API --
+    def submit(self, message: str) -> Future:
+        """Queue a message for the next micro-batch; the future resolves to its label."""
+        future: Future = Future()
+        if self._load_error is not None:
+            future.set_exception(IntentModelUnavailable(str(self._load_error)))
+            return future
+        self._ensure_worker()
+        self._queue.put((message, future))
+        return future
+
+    def classify(self, message: str, timeout: Optional[float] = 10.0) -> str:
+        return self.submit(message).result(timeout=timeout)
+
+    def classify_batch(self, messages: List[str], timeout: Optional[float] = 30.0) -> List[str]:
+        futures = [self.submit(m) for m in messages]
+        return [f.result(timeout=timeout) for f in futures]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "batches": self._batches,
+            "messages": self._messages,
+            "avg_batch_size": (self._messages / self._batches) if self._batches else 0.0,
+            "queue_depth": self._queue.qsize(),
+            "batch_size": self.batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+    # -- batching loop --
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._score(batch)
+
+    def _score(self, batch: List[Tuple[str, Future]]):
+        pending = [(m, f) for m, f in batch if f.set_running_or_notify_cancel()]
+        if not pending:
+            return
+        try:
+            rows = self._load_backend().score([m for m, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        self._batches += 1
+        self._messages += len(pending)
+        for (_, future), row in zip(pending, rows):
+            best = max(range(len(row)), key=row.__getitem__)
+            future.set_result(self.labels[best])
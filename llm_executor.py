@@ -0,0 +1,283 @@
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import os
+import threading
+import time
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class LLMTimeout(TimeoutError):
+    """The model call missed its deadline (queue wait included) and was cancelled."""
+
+
+class LLMExecutor:
+    """Process-wide runner for model calls with a concurrency bound and hard deadlines.
+
+    All generations run on one background event loop. Agents exposing
+    `arun` are awaited there, so hitting the deadline cancels the task and
+    aborts the HTTP request to Ollama. Agents with only a blocking `run`
+    go to a bounded thread pool; the caller still returns at the deadline,
+    but the thread finishes on its own (counted as `abandoned`) and keeps
+    its slot until it does, so later calls wait visibly in `queue_depth`
+    rather than inside the pool. `abandoned_running` counts those threads.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max(1, max_concurrency or int(os.environ.get("LLM_MAX_CONCURRENCY", "4")))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Slots bound the pool's use except for priority calls, which skip them; give those their own headroom
+        self._threads = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2 * self.max_concurrency, thread_name_prefix="pulse-llm"
+        )
+        self._start_lock = threading.Lock()
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "cancelled": 0,
+            "abandoned": 0,
+            "priority": 0,
+        }
+        self._queued = 0
+        self._in_flight = 0
+        self._abandoned_running = 0
+
+    # -- loop management --
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def serve():
+                    asyncio.set_event_loop(loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    ready.set()
+                    loop.run_forever()
+
+                threading.Thread(target=serve, name="pulse-llm-loop", daemon=True).start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    # -- public API --
+    def run(self, agent, query: str, max_tokens: int = 30, timeout: float = 8, priority: bool = False,
+            on_generated: Optional[Callable[[float], None]] = None) -> Any:
+        """Blocking call; raises LLMTimeout once `timeout` seconds have passed.
+
+        `priority` calls skip the slot queue entirely. `on_generated` receives
+        the seconds spent generating, queue wait excluded, once a started
+        generation ends (also by timeout or error); it is not called if the
+        call never got a slot.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._generate(agent, query, max_tokens, timeout, priority, on_generated), self._ensure_loop()
+        )
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            raise LLMTimeout("model call cancelled")
+
+    async def arun(self, agent, query: str, max_tokens: int = 30, timeout: float = 8, priority: bool = False,
+                   on_generated: Optional[Callable[[float], None]] = None) -> Any:
+        """Awaitable call from any event loop; cancelling the caller cancels the generation."""
+        future = asyncio.run_coroutine_threadsafe(
+            self._generate(agent, query, max_tokens, timeout, priority, on_generated), self._ensure_loop()
+        )
+        return await asyncio.wrap_future(future)
+
+    async def astream(self, agent, query: str, max_tokens: int = 30, timeout: float = 8,
+                      priority: bool = False, on_generated: Optional[Callable[[float], None]] = None
+                      ) -> AsyncIterator[str]:
+        """Yield text deltas as the model produces them, under the same slot limit and deadline.
+
+        Raises LLMTimeout when the deadline passes; closing the iterator early
+        cancels the generation.
+        """
+        caller_loop = asyncio.get_running_loop()
+        deltas: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue()
+
+        def emit(kind: str, value: Any = None):
+            caller_loop.call_soon_threadsafe(deltas.put_nowait, (kind, value))
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._stream(agent, query, max_tokens, timeout, emit, priority, on_generated), self._ensure_loop()
+        )
+        try:
+            while True:
+                kind, value = await deltas.get()
+                if kind == "delta":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "queue_depth": self._queued,
+            "in_flight": self._in_flight,
+            "abandoned_running": self._abandoned_running,
+            "max_concurrency": self.max_concurrency,
+        }
+
+    # -- execution on the background loop --
+    def _hold_slot(self, thread: concurrent.futures.Future, slot: bool) -> bool:
+        """Hand a timed-out blocking call's slot to its still-running thread; returns False (caller keeps none)."""
+        self._abandoned_running += 1
+        loop = asyncio.get_running_loop()
+
+        def finished():
+            self._abandoned_running -= 1
+            if slot:
+                self._semaphore.release()
+
+        thread.add_done_callback(lambda _: loop.call_soon_threadsafe(finished))
+        return False
+
+    async def _acquire(self, deadline: float, priority: bool) -> bool:
+        """Wait for a slot; returns whether one was taken (priority calls don't take one)."""
+        self._counters["submitted"] += 1
+        if priority:
+            self._counters["priority"] += 1
+            return False
+        self._queued += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            raise LLMTimeout("timed out waiting for a model slot")
+        finally:
+            self._queued -= 1
+            STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_queue")
+        return True
+
+    async def _generate(self, agent, query: str, max_tokens: int, timeout: float, priority: bool,
+                        on_generated: Optional[Callable[[float], None]] = None) -> Any:
+        deadline = time.monotonic() + timeout
+        slot = await self._acquire(deadline, priority)
+
+        self._in_flight += 1
+        thread = None
+        try:
+            remaining = max(0.0, deadline - time.monotonic())
+            if hasattr(agent, "arun"):
+                call = agent.arun(query, max_tokens=max_tokens)
+            else:
+                thread = self._threads.submit(functools.partial(agent.run, query, max_tokens=max_tokens))
+                call = asyncio.wrap_future(thread)
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(call, timeout=remaining)
+            except asyncio.TimeoutError:
+                self._counters["timeouts"] += 1
+                self._counters["cancelled" if thread is None else "abandoned"] += 1
+                if thread is not None:
+                    slot = self._hold_slot(thread, slot)
+                raise LLMTimeout(f"model call exceeded {timeout}s")
+            except asyncio.CancelledError:
+                self._counters["cancelled"] += 1
+                if thread is not None and not thread.done():
+                    slot = self._hold_slot(thread, slot)
+                raise
+            except Exception:
+                self._counters["errors"] += 1
+                raise
+            finally:
+                if on_generated is not None:
+                    on_generated(time.perf_counter() - started)
+            self._counters["completed"] += 1
+            STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_generate")
+            return result
+        finally:
+            self._in_flight -= 1
+            if slot:
+                self._semaphore.release()
+
+    async def _stream(self, agent, query: str, max_tokens: int, timeout: float, emit: Callable[..., None],
+                      priority: bool, on_generated: Optional[Callable[[float], None]] = None):
+        deadline = time.monotonic() + timeout
+        try:
+            slot = await self._acquire(deadline, priority)
+        except LLMTimeout as e:
+            emit("error", e)
+            return
+
+        self._in_flight += 1
+        started = time.perf_counter()
+
+        def generated():
+            # Before the final emit: the caller may release its admission ticket as soon as it sees it
+            if on_generated is not None:
+                on_generated(time.perf_counter() - started)
+
+        thread = None
+        try:
+            if hasattr(agent, "arun"):
+                async def pump():
+                    events = agent.arun(query, stream=True, max_tokens=max_tokens)
+                    if inspect.isawaitable(events):
+                        events = await events
+                    async for event in events:
+                        delta = stream_delta(event)
+                        if delta:
+                            emit("delta", delta)
+                call = pump()
+            else:
+                # Blocking agents can't stream: deliver the whole reply as one delta
+                thread = self._threads.submit(functools.partial(agent.run, query, max_tokens=max_tokens))
+
+                async def whole():
+                    result = await asyncio.wrap_future(thread)
+                    emit("delta", getattr(result, "content", None) or str(result))
+                call = whole()
+            await asyncio.wait_for(call, timeout=max(0.0, deadline - time.monotonic()))
+            self._counters["completed"] += 1
+            generated()
+            emit("done")
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            self._counters["cancelled" if thread is None else "abandoned"] += 1
+            if thread is not None:
+                slot = self._hold_slot(thread, slot)
+            generated()
+            emit("error", LLMTimeout(f"model stream exceeded {timeout}s"))
+        except asyncio.CancelledError:
+            self._counters["cancelled"] += 1
+            if thread is not None and not thread.done():
+                slot = self._hold_slot(thread, slot)
+            generated()
+            raise
+        except Exception as e:
+            self._counters["errors"] += 1
+            generated()
+            emit("error", e)
+        finally:
+            self._in_flight -= 1
+            if slot:
+                self._semaphore.release()
+
+
+def stream_delta(event: Any) -> Optional[str]:
+    """Text carried by one streamed agno event (RunContent), or None for lifecycle events."""
+    if isinstance(event, str):
+        return event
+    if getattr(event, "event", "RunContent") != "RunContent":
+        return None
+    content = getattr(event, "content", None)
+    return content if isinstance(content, str) else None
@@ -0,0 +1,182 @@
+import atexit
+import json
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+# ----------------- Formatting -----------------
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and every `extra=` field."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+# ----------------- Filtering -----------------
+class SamplingFilter(logging.Filter):
+    """Keeps `rate` of INFO-and-below records; warnings and errors always pass."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+# ----------------- Handlers -----------------
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotates when the file reaches `maxBytes` or every `interval` seconds, whichever comes first.
+
+    Backups are numbered (chatbot.log.1, .2, ...) as with RotatingFileHandler,
+    so a size and a time rollover in the same second can't collide.
+    """
+
+    def __init__(self, filename: str, maxBytes: int = 0, backupCount: int = 0, interval: float = 0,
+                 encoding: Optional[str] = "utf-8", delay: bool = False):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=delay)
+        self.interval = interval
+        self.rollover_at = time.time() + interval if interval > 0 else None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        if self.interval > 0:
+            self.rollover_at = time.time() + self.interval
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller: when the writer falls behind, records are dropped and counted."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# ----------------- Setup -----------------
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def build_handlers() -> List[logging.Handler]:
+    """The writer-side handlers, configured from LOG_* environment variables."""
+    handlers: List[logging.Handler] = []
+    text = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+
+    path = os.environ.get("LOG_FILE", "chatbot.log")
+    if path:
+        file_handler = SizeAndTimeRotatingFileHandler(
+            path,
+            maxBytes=int(os.environ.get("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+            backupCount=int(os.environ.get("LOG_BACKUP_COUNT", "5")),
+            interval=_env_float("LOG_ROTATE_INTERVAL", 86400),
+        )
+        file_handler.setFormatter(JsonFormatter() if os.environ.get("LOG_FORMAT", "json") == "json" else text)
+        handlers.append(file_handler)
+
+    if os.environ.get("LOG_CONSOLE", "1") != "0":
+        console = logging.StreamHandler(sys.stderr)
+        console.setFormatter(JsonFormatter() if os.environ.get("LOG_CONSOLE_FORMAT", "text") == "json" else text)
+        handlers.append(console)
+    return handlers
+
+
+def setup_logging(force: bool = False) -> Optional[logging.handlers.QueueListener]:
+    """Route the root logger through a bounded queue to a background writer thread.
+
+    Configuration, all optional:
+      LOG_CONFIG            path to a logging.config.dictConfig JSON file; replaces everything below
+      LOG_LEVEL             root level (INFO)
+      LOG_FILE              JSON log file, rotated by size and time ("chatbot.log"; empty disables)
+      LOG_FORMAT            "json" or "text" for the file
+      LOG_MAX_BYTES         rotate at this size (10 MiB)
+      LOG_ROTATE_INTERVAL   and/or every this many seconds (86400)
+      LOG_BACKUP_COUNT      rotated files kept (5)
+      LOG_CONSOLE           "0" disables stderr output
+      LOG_CONSOLE_FORMAT    "text" or "json" for stderr
+      LOG_INFO_SAMPLE_RATE  fraction of INFO records kept (1.0)
+      LOG_QUEUE_SIZE        records buffered before new ones are dropped (10000)
+    """
+    global _listener, _queue_handler
+    if _listener is not None and not force:
+        return _listener
+    shutdown_logging()
+
+    config_path = os.environ.get("LOG_CONFIG")
+    if config_path:
+        with open(config_path, "r", encoding="utf-8") as f:
+            logging.config.dictConfig(json.load(f))
+        return None
+
+    root = logging.getLogger()
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", "10000"))))
+    # Sample before enqueueing so dropped records cost nothing beyond the filter
+    _queue_handler.addFilter(SamplingFilter(_env_float("LOG_INFO_SAMPLE_RATE", 1.0)))
+    root.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *build_handlers(), respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+atexit.register(shutdown_logging)
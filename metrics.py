@@ -0,0 +1,207 @@
+import contextvars
+import logging
+import math
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans cache hits (~10us) up to slow model calls
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# ----------------- Instruments -----------------
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(labels[n] for n in self.labelnames), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items)
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(labels[n] for n in self.labelnames)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][idx] += 1
+            series[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(tuple(labels[n] for n in self.labelnames))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Holds instruments and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._gauges: Dict[str, Callable[[], Dict[str, object]]] = {}
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help, labelnames, buckets))
+
+    def gauges(self, prefix: str, collect: Callable[[], Dict[str, object]]):
+        """Export every numeric value of a stats() dict as `<prefix>_<key>` gauges, read at scrape time.
+
+        Registering a prefix again replaces its collector, so a module imported twice (as __main__ and by
+        name) does not emit each gauge family twice.
+        """
+        self._gauges[prefix] = collect
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for prefix, collect in self._gauges.items():
+            try:
+                values = collect()
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", prefix, e)
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "pulse_stage_seconds", "Time spent in each stage of handling a message.", ["stage"]
+)
+RISK_TOTAL = REGISTRY.counter("pulse_risk_total", "Messages by risk tier.", ["tier"])
+INTENT_TOTAL = REGISTRY.counter("pulse_intent_total", "Messages by classified intent.", ["intent"])
+INTENT_FALLBACK_TOTAL = REGISTRY.counter(
+    "pulse_intent_fallback_total", "Intents decided by the keyword fallback instead of a model."
+)
+REPLY_TOTAL = REGISTRY.counter(
+    "pulse_replies_total", "Replies by source: crisis, canned, cache, model, timeout, shed, empty.", ["source"]
+)
+CACHE_TOTAL = REGISTRY.counter("pulse_response_cache_total", "Response cache lookups by result.", ["result"])
+
+
+# ----------------- Stage Timing & Traces -----------------
+class Trace:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+        self.attrs: Dict[str, object] = {}
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("pulse_trace", default=None)
+
+# Fraction of requests whose per-stage timings are logged as one structured record (0 = off)
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0"))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block into pulse_stage_seconds{stage=name}, and into the request trace if one is sampled."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.stages.append((name, elapsed))
+
+
+def annotate(**attrs: object):
+    """Attach attributes (intent, risk, reply source...) to the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.attrs.update(attrs)
+
+
+@contextmanager
+def traced(kind: str, sample_rate: Optional[float] = None) -> Iterator[Optional[Trace]]:
+    """Sample this request for a stage trace; the trace is logged when the block exits."""
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or random.random() >= rate or _current_trace.get() is not None:
+        yield None
+        return
+    trace = Trace(kind)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        total = time.perf_counter() - trace.started
+        stages = [[name, round(s * 1000, 3)] for name, s in trace.stages]
+        logger.info("trace %s total=%.3fms stages=%s", trace.kind, total * 1000, stages, extra={"trace": {
+            "kind": trace.kind,
+            "total_ms": round(total * 1000, 3),
+            "stages": stages,
+            **trace.attrs,
+        }})
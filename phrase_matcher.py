@@ -0,0 +1,162 @@
+import json
+import os
+import re
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Iterable, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# ----------------- Trie Regex -----------------
+def _trie_regex(phrases: Iterable[str]) -> str:
+    """Build a prefix-factored alternation so matching cost tracks phrase length, not phrase count."""
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        if not phrase:
+            continue
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node: Dict[str, Any]) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Greedy: prefer the longest phrase, backtrack to this one if the tail doesn't fit
+            return f"(?:{body})?"
+        return body
+
+    return emit(trie) if trie else "(?!)"
+
+
+class PhraseMatcher:
+    """Single-pass word-boundary matcher over several prioritised phrase groups.
+
+    Every start position is tried once against a lookahead that holds one
+    trie-compiled alternation per group; groups earlier in the list win when
+    phrases from different groups match at the same position. Semantics equal
+    running `re.search(rf"\\b{re.escape(p)}\\b")` for every phrase.
+    """
+
+    def __init__(self, groups: Sequence[Tuple[str, Iterable[str]]]):
+        self.groups = [name for name, _ in groups]
+        parts = [f"(?P<g{i}>{_trie_regex(phrases)})" for i, (_, phrases) in enumerate(groups)]
+        self.pattern = re.compile(r"(?=\b(?:" + "|".join(parts or ["(?!)"]) + r")\b)")
+
+    def scan(self, text: str) -> List[Tuple[str, str]]:
+        """Return (group, phrase) for every match in text order; text is expected lowercase."""
+        hits = []
+        for m in self.pattern.finditer(text):
+            idx = m.lastindex - 1
+            hits.append((self.groups[idx], m.group(m.lastindex)))
+        return hits
+
+
+# ----------------- Risk Matcher -----------------
+class RiskMatch(NamedTuple):
+    tier: str
+    phrases: List[str]
+
+
+class RiskMatcher:
+    """Compiled distress-phrase scanner for the high/medium risk tiers."""
+
+    def __init__(self, high_risk: Iterable[str], medium_risk: Iterable[str]):
+        self.words = {
+            "high_risk": [w.lower() for w in high_risk],
+            "medium_risk": [w.lower() for w in medium_risk],
+        }
+        self._matcher = PhraseMatcher([("high", self.words["high_risk"]), ("medium", self.words["medium_risk"])])
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[str]]) -> "RiskMatcher":
+        return cls(data.get("high_risk", []), data.get("medium_risk", []))
+
+    def scan(self, text: str) -> RiskMatch:
+        tier = "low"
+        phrases: List[str] = []
+        for group, phrase in self._matcher.scan(text.lower()):
+            if group == "high":
+                tier = "high"
+            elif tier == "low":
+                tier = "medium"
+            if phrase not in phrases:
+                phrases.append(phrase)
+        return RiskMatch(tier, phrases)
+
+
+# ----------------- Hot Reload -----------------
+class WatchedJSON(Generic[T]):
+    """Keeps an object built from a JSON data file, rebuilding it when the file changes.
+
+    The file's mtime is checked at most every `interval` seconds. A rebuild
+    happens off to the side and is swapped in with a single assignment, so
+    readers always see either the old or the new object; a bad edit keeps
+    the old one.
+    """
+
+    def __init__(self, candidates: Sequence[Path], build: Callable[[Dict[str, Any]], T],
+                 default: Callable[[], T], interval: Optional[float] = None):
+        self.candidates = list(candidates)
+        self.build = build
+        if interval is None:
+            interval = float(os.environ.get("DATA_RELOAD_INTERVAL", "2"))
+        self.interval = interval
+        self._default = default
+        self._state: Optional[Tuple[Optional[Path], float, T]] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Optional[Path]:
+        for path in self.candidates:
+            if path.exists():
+                return path
+        return None
+
+    def get(self) -> T:
+        now = time.monotonic()
+        if self._state is None or now >= self._next_check:
+            self._refresh(now)
+        return self._state[2]
+
+    def reload(self) -> T:
+        """Force a re-read regardless of mtime."""
+        self._refresh(time.monotonic(), force=True)
+        return self._state[2]
+
+    def _refresh(self, now: float, force: bool = False):
+        with self._lock:
+            if self._state is not None and now < self._next_check and not force:
+                return
+            self._next_check = now + self.interval
+            path = self.path
+            mtime = path.stat().st_mtime if path else 0.0
+            unchanged = self._state is not None and self._state[0] == path and self._state[1] == mtime
+            if unchanged and not force:
+                return
+            if path is None:
+                if self._state is None:
+                    logger.warning("No %s found", self.candidates[0].name)
+                    self._state = (None, 0.0, self._default())
+                return
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                built = self.build(data)
+            except Exception as e:
+                logger.error("Failed to load %s: %s", path, e)
+                previous = self._state[2] if self._state is not None else self._default()
+                self._state = (path, mtime, previous)
+                return
+            if self._state is not None:
+                logger.info("Reloaded %s", path)
+            self._state = (path, mtime, built)
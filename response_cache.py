@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+
+
+def normalize_message(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial variants share a key."""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+class ResponseCache:
+    """LRU + TTL cache of model replies, optionally persisted to a SQLite file.
+
+    Entries remember how long the original generation took so hits can
+    report the latency they saved. Disk writes go through a queue to a
+    writer thread, so `put` never waits on SQLite; the writer also deletes
+    what the LRU evicts and prunes expired and surplus rows every
+    PRUNE_INTERVAL seconds, keeping the file at about `capacity` rows.
+    """
+
+    PRUNE_INTERVAL = 60.0
+    MAX_PENDING_WRITES = 1024
+
+    def __init__(self, capacity: int = 2048, ttl: float = 86400, path: Optional[str] = None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.path = path
+        self._data: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._persistent = False
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._writer_pid: Optional[int] = None
+        self._dropped_writes = 0
+        self._hits = 0
+        self._misses = 0
+        self._latency_saved = 0.0
+        if path and capacity > 0:
+            self._open(path)
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    @staticmethod
+    def key(message: str, model_id: str, options: Any = None, extra: Any = None) -> str:
+        raw = json.dumps([normalize_message(message), model_id, options, extra], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl:
+                del self._data[key]
+                self._persist(("delete", key))
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            self._latency_saved += entry[2]
+            return entry[1]
+
+    def put(self, key: str, reply: str, latency: float = 0.0) -> None:
+        if not self.enabled or not reply:
+            return
+        created = time.time()
+        with self._lock:
+            self._data[key] = (created, reply, latency)
+            self._data.move_to_end(key)
+            self._persist(("put", key, reply, latency, created))
+            while len(self._data) > self.capacity:
+                evicted, _ = self._data.popitem(last=False)
+                self._persist(("delete", evicted))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued disk writes are done; False on timeout."""
+        q = self._queue
+        if q is None or self._writer_pid != os.getpid():
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while q.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._data),
+            "capacity": self.capacity,
+            "ttl_seconds": self.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": (self._hits / lookups) if lookups else 0.0,
+            "latency_saved_seconds": round(self._latency_saved, 3),
+            "persistent": self._persistent,
+            "pending_writes": self._queue.qsize() if self._queue is not None else 0,
+            "dropped_writes": self._dropped_writes,
+        }
+
+    # -- persistence --
+    def _persist(self, op: Tuple):
+        """Queue a disk write; called with _lock held. Dropped, not blocked on, if the writer falls behind."""
+        if not self._persistent:
+            return
+        if self._writer_pid != os.getpid():
+            # First write, or a pre-forked worker: the parent's writer thread did not survive the fork
+            self._queue = queue.Queue(maxsize=self.MAX_PENDING_WRITES)
+            self._thread = threading.Thread(target=self._write_loop, args=(self._queue,),
+                                            name="response-cache-writer", daemon=True)
+            self._writer_pid = os.getpid()
+            self._thread.start()
+        try:
+            self._queue.put_nowait(op)
+        except queue.Full:
+            self._dropped_writes += 1
+
+    def _write_loop(self, q: queue.Queue):
+        try:
+            db = self._connect(self.path)
+        except sqlite3.Error as e:
+            logger.warning("Response cache writer could not open %s: %s", self.path, e)
+            db = None
+        next_prune = time.monotonic() + self.PRUNE_INTERVAL
+        while True:
+            try:
+                batch = [q.get(timeout=max(0.0, next_prune - time.monotonic()))]
+            except queue.Empty:
+                batch = []
+            while len(batch) < 256:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if db is not None and batch:
+                    self._apply(db, batch)
+                if db is not None and time.monotonic() >= next_prune:
+                    self._prune(db)
+                    next_prune = time.monotonic() + self.PRUNE_INTERVAL
+            except sqlite3.Error as e:
+                logger.warning("Response cache write failed: %s", e)
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+    @staticmethod
+    def _apply(db: sqlite3.Connection, batch):
+        db.execute("BEGIN")
+        try:
+            for op in batch:
+                if op[0] == "put":
+                    db.execute(
+                        "INSERT OR REPLACE INTO responses (key, reply, latency, created_at) VALUES (?, ?, ?, ?)",
+                        op[1:],
+                    )
+                else:
+                    db.execute("DELETE FROM responses WHERE key = ?", (op[1],))
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _prune(self, db: sqlite3.Connection) -> int:
+        """Delete expired rows, then the oldest beyond capacity; returns how many went."""
+        removed = db.execute("DELETE FROM responses WHERE created_at <= ?", (time.time() - self.ttl,)).rowcount
+        removed += db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.capacity,),
+        ).rowcount
+        return removed
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _open(self, path: str):
+        db = None
+        try:
+            db = self._connect(path)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, reply TEXT NOT NULL, latency REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._prune(db)
+            rows = db.execute(
+                "SELECT key, reply, latency, created_at FROM responses ORDER BY created_at DESC LIMIT ?",
+                (self.capacity,),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Response cache at %s unavailable, keeping it in memory only: %s", path, e)
+            return
+        finally:
+            if db is not None:
+                db.close()
+        for key, reply, latency, created in reversed(rows):
+            self._data[key] = (created, reply, latency)
+        self._persistent = True
+        logger.info("Loaded %d cached responses from %s", len(rows), path)
+
+
+def make_response_cache() -> ResponseCache:
+    """Build the cache from RESPONSE_CACHE_SIZE (0 disables), RESPONSE_CACHE_TTL and RESPONSE_CACHE_PATH."""
+    return ResponseCache(
+        capacity=int(os.environ.get("RESPONSE_CACHE_SIZE", "2048")),
+        ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "86400")),
+        path=os.environ.get("RESPONSE_CACHE_PATH") or None,
+    )
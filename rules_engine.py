@@ -0,0 +1,96 @@
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from phrase_matcher import PhraseMatcher
+from response_cache import normalize_message
+
+_WORD = re.compile(r"\w")
+
+
+class Rule(NamedTuple):
+    id: str
+    priority: int
+    reply: str
+
+
+class RuleMatch(NamedTuple):
+    rule: Optional[Rule]
+    intent: str
+
+    @property
+    def reply(self) -> Optional[str]:
+        return self.rule.reply if self.rule else None
+
+
+def _boundary_inside(phrase: str, i: int) -> bool:
+    """Whether \\b holds between phrase[i-1] and phrase[i]."""
+    return bool(_WORD.match(phrase[i - 1])) != bool(_WORD.match(phrase[i]))
+
+
+class RuleSet:
+    """Canned replies and fallback intent keywords compiled from data/quick_responses.json.
+
+    `exact` rules match the whole normalized message; `phrases` rules and
+    intents match on word boundaries anywhere in it. All phrases share one
+    PhraseMatcher, so a message is scanned once however many rules exist;
+    the lowest `priority` value wins.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], intents: List[Dict[str, Any]], default_intent: str = "general"):
+        self.default_intent = default_intent
+        self.exact: Dict[str, Rule] = {}
+        # phrase -> (best reply rule, best (priority, intent)) among everything that phrase implies
+        targets: Dict[str, Tuple[Optional[Rule], Optional[Tuple[int, str]]]] = {}
+
+        def add(phrase: str, rule: Optional[Rule] = None, intent: Optional[Tuple[int, str]] = None):
+            phrase = phrase.lower()
+            best_rule, best_intent = targets.get(phrase, (None, None))
+            if rule and (best_rule is None or rule.priority < best_rule.priority):
+                best_rule = rule
+            if intent and (best_intent is None or intent < best_intent):
+                best_intent = intent
+            targets[phrase] = (best_rule, best_intent)
+
+        for spec in rules:
+            rule = Rule(str(spec["id"]), int(spec.get("priority", 100)), str(spec["reply"]))
+            for text in spec.get("exact", []):
+                key = normalize_message(text)
+                if key not in self.exact or rule.priority < self.exact[key].priority:
+                    self.exact[key] = rule
+            for phrase in spec.get("phrases", []):
+                add(phrase, rule=rule)
+        for spec in intents:
+            intent = (int(spec.get("priority", 100)), str(spec["label"]))
+            for phrase in spec.get("phrases", []):
+                add(phrase, intent=intent)
+
+        # The matcher reports the longest phrase at each position, so fold in every
+        # shorter phrase that would also have matched there ("thank" inside "thank you").
+        for phrase in sorted(targets, key=len):
+            for i in range(1, len(phrase)):
+                prefix = phrase[:i]
+                if prefix in targets and _boundary_inside(phrase, i):
+                    rule, intent = targets[prefix]
+                    add(phrase, rule=rule, intent=intent)
+
+        self.targets = targets
+        self._matcher = PhraseMatcher([("phrase", targets.keys())])
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RuleSet":
+        return cls(data.get("rules", []), data.get("intents", []), data.get("default_intent", "general"))
+
+    def __len__(self) -> int:
+        return len(self.exact) + len(self.targets)
+
+    def match(self, message: str) -> RuleMatch:
+        """Winning canned-reply rule (if any) and fallback intent, from a single scan."""
+        best_rule = self.exact.get(normalize_message(message))
+        best_intent: Optional[Tuple[int, str]] = None
+        for _, phrase in self._matcher.scan(message.lower()):
+            rule, intent = self.targets[phrase]
+            if rule and (best_rule is None or rule.priority < best_rule.priority):
+                best_rule = rule
+            if intent and (best_intent is None or intent < best_intent):
+                best_intent = intent
+        return RuleMatch(best_rule, best_intent[1] if best_intent else self.default_intent)
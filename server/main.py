@@ -1,13 +1,71 @@
+from contextlib import asynccontextmanager, nullcontext
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional, List, Union, Dict, Any
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Tuple, Union, Dict, Any
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
 import uvicorn
 
 # Import our local chatbot factory and helpers
-from chatbot import make_agent, process_message
+import chatbot
+from chatbot import make_agent, aprocess_message, astream_message, aclassify_texts, intent_cascade, llm_executor, session_store, response_cache, admission
+from metrics import REGISTRY, stage, traced
 
-app = FastAPI(title="Pulse AI Chat API", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+# WARMUP=0 skips loading models at startup (they load on first use) and reports ready immediately
+WARMUP = os.environ.get("WARMUP", "1") != "0"
+
+# What /ready reports; filled in by warm_up()
+readiness: Dict[str, Any] = {"ready": False, "warmup_seconds": None, "intent_model": None, "agent": None,
+                             "error": None}
+
+
+async def warm_up():
+    """Load the intent model and build the agent in the background, then flip /ready.
+
+    If loading fails, /ready stays 503 and reports the error instead of the task dying unseen.
+    """
+    started = time.perf_counter()
+    try:
+        readiness["intent_model"] = await run_in_threadpool(chatbot.warm_up)
+        crisis_response(chatbot.make_counsellor_payload())
+    except Exception as e:
+        logger.exception("Warm-up failed")
+        readiness["error"] = f"{type(e).__name__}: {e}"
+        readiness["warmup_seconds"] = round(time.perf_counter() - started, 3)
+        return
+    try:
+        await run_in_threadpool(get_agent)
+        readiness["agent"] = True
+    except HTTPException as e:
+        # Canned and crisis replies still work; free text retries the agent per request
+        logger.warning("Agent unavailable after warm-up: %s", e.detail)
+        readiness["agent"] = False
+    readiness["warmup_seconds"] = round(time.perf_counter() - started, 3)
+    readiness["ready"] = True
+    logger.info("Warm-up finished in %.2fs", readiness["warmup_seconds"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve /health straight away; /ready answers 200 once the models are warm
+    task = asyncio.create_task(warm_up()) if WARMUP else None
+    if task is None:
+        readiness["ready"] = True
+    yield
+    if task is not None:
+        task.cancel()
+
+
+app = FastAPI(title="Pulse AI Chat API", version="1.0.0", lifespan=lifespan)
 
 # CORS: allow localhost dev and production origins
 app.add_middleware(
@@ -45,14 +103,77 @@ class ChatResponse(BaseModel):
     last_topic: Optional[str] = None
 
 
-# Create a single agent instance for the server process
-try:
-    agent = make_agent()
-except Exception as e:
-    # Defer failure until first request, but log it
-    agent = None
-    import traceback
-    traceback.print_exc()
+class ChatBatchRequest(BaseModel):
+    messages: List[ChatRequest]
+
+
+class ChatBatchResponse(BaseModel):
+    results: List[ChatResponse]
+
+
+class ClassifyRequest(BaseModel):
+    text: str = Field(..., min_length=1)
+
+
+class ClassifyBatchRequest(BaseModel):
+    texts: List[str]
+
+
+class ClassifyResult(BaseModel):
+    label: str
+    intent: str
+    risk: str
+    matched_phrases: List[str]
+
+
+class ClassifyBatchResponse(BaseModel):
+    results: List[ClassifyResult]
+
+
+# Upper bound on items per batch request
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "256"))
+
+# Upper bound on k for /api/counsellors/rank
+RANK_MAX_K = int(os.environ.get("RANK_MAX_K", "100"))
+
+
+class QuestionnaireAnswers(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    q1: Optional[str] = None
+    q2: Optional[str] = None
+    q3: Optional[str] = None
+    free_text: Optional[str] = Field(None, alias="freeText")
+
+
+class RankRequest(BaseModel):
+    answers: QuestionnaireAnswers = Field(default_factory=QuestionnaireAnswers)
+    intent: Optional[str] = None
+    language: Optional[str] = None
+    k: int = Field(10, ge=1, le=RANK_MAX_K)
+
+
+class RankedCounsellor(BaseModel):
+    id: str
+    name: str
+    specialization: str
+    affiliation: Optional[str]
+    location_match: bool
+    ranking_score: Optional[float]  # stored rating
+    score: float  # what the results are ordered by
+    fees: Optional[int]
+    experience_years: Optional[int]
+    languages: List[str]
+
+
+class RankResponse(BaseModel):
+    label: Optional[str]
+    results: List[RankedCounsellor]
+
+
+# Single agent instance for the server process, built during warm-up or on the first request
+agent = None
+_agent_lock = threading.Lock()
 
 
 @app.get("/health")
@@ -60,34 +181,115 @@ async def health():
     return {"ok": True}
 
 
+@app.get("/ready")
+async def ready():
+    """503 until warm-up has loaded the models (or with `error` set if it failed); point readiness checks here."""
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+@app.get("/api/stats")
+async def stats():
+    return {
+        "llm": llm_executor.stats(),
+        "admission": admission.stats(),
+        "intent": intent_cascade.stats(),
+        "sessions": session_store.stats(),
+        "response_cache": response_cache.stats(),
+        "counsellors": chatbot.counsellor_roster.get().stats(),
+    }
+
+
+# Queue depths, hit rates and the like, read from each component's stats() at scrape time
+REGISTRY.gauges("pulse_llm", llm_executor.stats)
+REGISTRY.gauges("pulse_admission", admission.stats)
+REGISTRY.gauges("pulse_sessions", session_store.stats)
+REGISTRY.gauges("pulse_response_cache", response_cache.stats)
+REGISTRY.gauges("pulse_intent_stage_hits", lambda: intent_cascade.stats()["stage_hits"])
+REGISTRY.gauges("pulse_intent_model", lambda: intent_cascade.stats()["zero_shot"])
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of stage latencies, outcome counters and component gauges."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def get_agent():
+    global agent
+    # Lazily construct the agent if earlier init failed; the lock stops warm-up and requests building two
+    if agent is None:
+        with _agent_lock:
+            if agent is None:
+                try:
+                    agent = make_agent()
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=f"Failed to initialize agent: {e}")
+    return agent
+
+
+async def aget_agent():
+    """get_agent for handlers: building the agent imports agno, which must not stall the event loop."""
+    if agent is not None:
+        return agent
+    return await run_in_threadpool(get_agent)
+
+
+def to_chat_response(reply_data: Union[str, Dict[str, Any]]) -> ChatResponse:
+    # Handle both string replies and counsellor suggestion dictionaries
+    if isinstance(reply_data, dict) and reply_data.get("type") == "counsellor_suggestion":
+        return crisis_response(reply_data)[0]
+    # Regular string reply
+    return ChatResponse(reply=str(reply_data), last_topic=None)
+
+
+# (payload, validated model, encoded body) for the current crisis payload version
+_crisis_cache: Optional[Tuple[Dict[str, Any], ChatResponse, str]] = None
+
+
+def crisis_response(payload: Dict[str, Any]) -> Tuple[ChatResponse, str]:
+    """Validated and JSON-encoded crisis reply; chatbot hands out the same payload object until the roster changes."""
+    global _crisis_cache
+    cached = _crisis_cache
+    if cached is None or cached[0] is not payload:
+        response = ChatResponse(
+            reply=CounsellorSuggestion(
+                type=payload["type"],
+                message=payload["message"],
+                counsellors=[CounsellorInfo(**c) for c in payload["counsellors"]],
+            ),
+            last_topic=None,
+        )
+        cached = _crisis_cache = (payload, response, response.model_dump_json())
+    return cached[1], cached[2]
+
+
+def encode_chat_response(reply_data: Union[str, Dict[str, Any]]) -> str:
+    if isinstance(reply_data, dict) and reply_data.get("type") == "counsellor_suggestion":
+        return crisis_response(reply_data)[1]
+    return to_chat_response(reply_data).model_dump_json()
+
+
+def check_batch_size(n: int):
+    if n == 0:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    if n > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {n} items, limit is {BATCH_MAX_ITEMS}")
+
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def api_chat(payload: ChatRequest):
-    global agent
     if not payload.message or not payload.message.strip():
         raise HTTPException(status_code=400, detail="Empty message")
 
-    # Lazily construct the agent if earlier init failed
-    if agent is None:
-        try:
-            agent = make_agent()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to initialize agent: {e}")
+    agent = await aget_agent()
 
     try:
-        reply_data = process_message(agent, payload.message.strip(), session_id=payload.session_id)
-        
-        # Handle both string replies and counsellor suggestion dictionaries
-        if isinstance(reply_data, dict) and reply_data.get("type") == "counsellor_suggestion":
-            # Convert dict to CounsellorSuggestion model
-            counsellor_suggestion = CounsellorSuggestion(
-                type=reply_data["type"],
-                message=reply_data["message"],
-                counsellors=[CounsellorInfo(**c) for c in reply_data["counsellors"]]
-            )
-            return ChatResponse(reply=counsellor_suggestion, last_topic=None)
-        else:
-            # Regular string reply
-            return ChatResponse(reply=str(reply_data), last_topic=None)
+        with traced("api_chat"), stage("handler"):
+            reply_data = await aprocess_message(agent, payload.message.strip(), session_id=payload.session_id)
+            # Validate and encode here rather than in FastAPI so the cost shows up as its own stage
+            with stage("serialize"):
+                body = encode_chat_response(reply_data)
+        return Response(content=body, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
@@ -96,7 +298,106 @@ async def api_chat(payload: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Model error: {e}")
 
 
+@app.post("/api/chat/batch", response_model=ChatBatchResponse)
+async def api_chat_batch(payload: ChatBatchRequest):
+    """Replies in request order; messages run concurrently under the same admission control as /api/chat.
+
+    At most `admission.limit` items are in flight, so a large batch waits for slots instead of
+    shedding its own tail. Items that share a `session_id` run one after another, in order.
+    """
+    check_batch_size(len(payload.messages))
+    if any(not m.message.strip() for m in payload.messages):
+        raise HTTPException(status_code=400, detail="Empty message")
+
+    agent = await aget_agent()
+    slots = asyncio.Semaphore(chatbot.admission.limit)
+    sessions: Dict[str, asyncio.Lock] = {}
+
+    async def one(m: ChatRequest):
+        # Take the session's turn before a slot, so queued turns of one session don't hold slots
+        async with sessions.setdefault(m.session_id, asyncio.Lock()) if m.session_id else nullcontext():
+            async with slots:
+                return await aprocess_message(agent, m.message.strip(), session_id=m.session_id)
+
+    try:
+        replies = await asyncio.gather(*[one(m) for m in payload.messages])
+        return ChatBatchResponse(results=[to_chat_response(r) for r in replies])
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Model error: {e}")
+
+
+@app.post("/api/classify", response_model=ClassifyResult)
+async def api_classify(payload: ClassifyRequest):
+    """Risk tier, matched distress phrases and intent for one text; `label` is a specialization keyword."""
+    if not payload.text.strip():
+        raise HTTPException(status_code=400, detail="Empty text")
+    (result,) = await aclassify_texts([payload.text.strip()])
+    return result
+
+
+@app.post("/api/classify/batch", response_model=ClassifyBatchResponse)
+async def api_classify_batch(payload: ClassifyBatchRequest):
+    check_batch_size(len(payload.texts))
+    texts = [t.strip() for t in payload.texts]
+    blank = [i for i, t in enumerate(texts) if not t]
+    if blank:
+        raise HTTPException(status_code=400, detail=f"Empty text at index {', '.join(map(str, blank[:10]))}")
+    return {"results": await aclassify_texts(texts)}
+
+
+@app.post("/api/counsellors/rank", response_model=RankResponse)
+async def api_rank_counsellors(payload: RankRequest):
+    """Top-k counsellors for questionnaire answers; free text is classified here unless `intent` is given."""
+    answers = payload.answers
+    label = None
+    free_text = (answers.free_text or "").strip()
+    if payload.intent is not None:
+        label = chatbot.INTENT_SPECIALIZATIONS.get(payload.intent, "general")
+    elif len(free_text) >= 5:
+        (result,) = await aclassify_texts([free_text])
+        label = result["label"]
+    results = chatbot.rank_counsellors(
+        {"q1": answers.q1, "q2": answers.q2, "q3": answers.q3}, label=label, language=payload.language, k=payload.k,
+    )
+    return {"label": label, "results": results}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def api_chat_stream(payload: ChatRequest):
+    """Server-Sent Events: `token` events carry deltas, a final `done` event carries the full reply."""
+    if not payload.message or not payload.message.strip():
+        raise HTTPException(status_code=400, detail="Empty message")
+
+    agent = await aget_agent()
+
+    async def events():
+        try:
+            async for event in astream_message(agent, payload.message.strip(), session_id=payload.session_id):
+                yield sse_event(event["type"], event)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield sse_event("error", {"type": "error", "detail": f"Model error: {e}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run("server.main:app", host="0.0.0.0", port=port, reload=False)
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        # Load everything once here and fork the workers so they share it; see server/prefork.py
+        from server.prefork import serve
+        serve("0.0.0.0", port, workers)
+    else:
+        uvicorn.run("server.main:app", host="0.0.0.0", port=port, reload=False)
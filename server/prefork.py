@@ -0,0 +1,108 @@
+"""Pre-fork launcher: load the app and its models once, then fork workers that share them.
+
+uvicorn's own `--workers` spawns fresh interpreters, so every worker pays
+for the imports and the intent model again and keeps a private copy. Here
+the parent imports server.main, runs chatbot.preload() and only then forks,
+so workers start with everything already in memory (shared copy-on-write)
+and only run the per-process warm-up before /ready turns 200.
+
+    WEB_CONCURRENCY=4 python -m server.prefork
+"""
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict
+
+import uvicorn
+
+from log_pipeline import setup_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
+
+
+def bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker(app, sock: socket.socket):
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    setup_logging(force=True)
+    code = 0
+    try:
+        uvicorn.Server(uvicorn.Config(app, lifespan="on")).run(sockets=[sock])
+    except BaseException:
+        logger.exception("Worker %d crashed", os.getpid())
+        code = 1
+    finally:
+        shutdown_logging()
+    os._exit(code)
+
+
+def _fork(app, sock: socket.socket) -> int:
+    # The log writer thread doesn't survive a fork; stop it around the fork and restart it on both sides
+    shutdown_logging()
+    pid = os.fork()
+    if pid == 0:
+        _worker(app, sock)
+    setup_logging(force=True)
+    return pid
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 2):
+    started = time.perf_counter()
+    import chatbot
+    from server.main import app
+
+    chatbot.preload()
+    # Keep the preloaded objects out of future collections so the GC doesn't dirty their shared pages
+    gc.freeze()
+    logger.info("Preloaded in %.2fs, forking %d workers", time.perf_counter() - started, workers)
+
+    sock = bind(host, port)
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for slot in range(workers):
+        children[_fork(app, sock)] = slot
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        logger.warning("Worker %d exited with status %d, restarting", pid, os.waitstatus_to_exitcode(status))
+        time.sleep(1)
+        children[_fork(app, sock)] = slot
+    sock.close()
+
+
+if __name__ == "__main__":
+    serve(
+        os.environ.get("HOST", "0.0.0.0"),
+        int(os.environ.get("PORT", 8000)),
+        int(os.environ.get("WEB_CONCURRENCY", "2")),
+    )
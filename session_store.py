@@ -0,0 +1,202 @@
+import json
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import sys
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Session = Dict[str, Optional[str]]
+
+
+def new_session() -> Session:
+    return {"last_topic": None, "last_prompt_key": None}
+
+
+class SessionStore(ABC):
+    """Where per-conversation state (last_topic, last_prompt_key) lives between messages.
+
+    `blocking` stores do I/O that can stall (disk, locks); async callers run them in a thread.
+    """
+
+    blocking = False
+
+    def __init__(self, capacity: int, ttl: float):
+        self.capacity = max(1, capacity)
+        self.ttl = ttl
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @abstractmethod
+    def get(self, session_id: str) -> Session:
+        """Return a copy of the session, or a fresh one if it is unknown or expired."""
+
+    @abstractmethod
+    def save(self, session_id: str, session: Session) -> None:
+        """Store a copy of the session and mark it as just used."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored sessions, expired ones included until they are evicted."""
+
+    def _record(self, hit: bool):
+        if hit:
+            self._hits += 1
+        else:
+            self._misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "backend": type(self).__name__,
+            "size": len(self),
+            "capacity": self.capacity,
+            "ttl_seconds": self.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": (self._hits / lookups) if lookups else 0.0,
+            "evictions": self._evictions,
+        }
+
+
+# ----------------- In-Memory -----------------
+class MemorySessionStore(SessionStore):
+    """LRU + TTL store for a single worker process."""
+
+    def __init__(self, capacity: int = 10000, ttl: float = 7200):
+        super().__init__(capacity, ttl)
+        self._data: "OrderedDict[str, Tuple[float, Session]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Running total of _entry_bytes over _data, so stats() never walks the sessions
+        self._entry_total = 0
+
+    @staticmethod
+    def _entry_bytes(session_id: str, session: Session) -> int:
+        return sys.getsizeof(session_id) + sum(sys.getsizeof(v) for v in session.values())
+
+    def _drop(self, session_id: str, session: Session):
+        self._entry_total -= self._entry_bytes(session_id, session)
+        self._evictions += 1
+
+    def get(self, session_id: str) -> Session:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self._data[session_id]
+                self._drop(session_id, entry[1])
+                entry = None
+            self._record(entry is not None)
+            if entry is None:
+                return new_session()
+            self._data.move_to_end(session_id)
+            return dict(entry[1])
+
+    def save(self, session_id: str, session: Session) -> None:
+        session = dict(session)
+        with self._lock:
+            old = self._data.get(session_id)
+            if old is not None:
+                self._entry_total -= self._entry_bytes(session_id, old[1])
+            self._data[session_id] = (time.monotonic(), session)
+            self._entry_total += self._entry_bytes(session_id, session)
+            self._data.move_to_end(session_id)
+            while len(self._data) > self.capacity:
+                evicted_id, (_, evicted) = self._data.popitem(last=False)
+                self._drop(evicted_id, evicted)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "approx_bytes": sys.getsizeof(self._data) + self._entry_total}
+
+
+# ----------------- SQLite (multi-worker) -----------------
+class SQLiteSessionStore(SessionStore):
+    """Store shared by every worker on the host through one SQLite file in WAL mode."""
+
+    blocking = True
+    _PRUNE_EVERY = 256
+
+    def __init__(self, path: str = "sessions.db", capacity: int = 10000, ttl: float = 7200):
+        super().__init__(capacity, ttl)
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions(updated_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread (and per process: a forked child reopens its own)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, session_id: str) -> Session:
+        row = self._conn().execute(
+            "SELECT data FROM sessions WHERE id = ? AND updated_at > ?", (session_id, time.time() - self.ttl)
+        ).fetchone()
+        self._record(row is not None)
+        if row is None:
+            return new_session()
+        return {**new_session(), **json.loads(row[0])}
+
+    def save(self, session_id: str, session: Session) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO sessions (id, data, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+            (session_id, json.dumps(session), time.time()),
+        )
+        self._writes += 1
+        if self._writes % self._PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Drop expired sessions, then the least recently updated ones beyond capacity."""
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM sessions WHERE updated_at <= ?", (time.time() - self.ttl,)).rowcount
+        removed += conn.execute(
+            "DELETE FROM sessions WHERE id IN ("
+            " SELECT id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.capacity,),
+        ).rowcount
+        self._evictions += removed
+        return removed
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return {**super().stats(), "path": self.path, "approx_bytes": page_count * page_size}
+
+
+def make_session_store() -> SessionStore:
+    """Build the store selected by SESSION_BACKEND (memory | sqlite)."""
+    backend = os.environ.get("SESSION_BACKEND", "memory").lower()
+    capacity = int(os.environ.get("SESSION_CAPACITY", "10000"))
+    ttl = float(os.environ.get("SESSION_TTL", "7200"))
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.environ.get("SESSION_DB_PATH", "sessions.db"), capacity=capacity, ttl=ttl)
+    if backend != "memory":
+        logger.warning("Unknown SESSION_BACKEND=%r, using memory", backend)
+    return MemorySessionStore(capacity=capacity, ttl=ttl)
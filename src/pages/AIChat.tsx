@@ -126,45 +126,87 @@ const AIChat = () => {
       const affirmative = /^(yes|yeah|yep|y|sure|ok|okay|please|pls|plz|s)$/i.test(lower) || lower.includes('yes please') || lower.includes('yes plz');
       const outboundMessage = affirmative && lastTopic ? 'explain more' : userMessage.content;
 
-      const res = await fetch(`${API_BASE}/api/chat`, {
+      // Stream the reply (Server-Sent Events) so text shows up as soon as the first token arrives
+      const res = await fetch(`${API_BASE}/api/chat/stream`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ message: outboundMessage, session_id: sessionId ?? undefined }),
       });
 
-      if (!res.ok) {
+      if (!res.ok || !res.body) {
         const err = await res.json().catch(() => ({}));
         throw new Error(err?.detail || `Server error (${res.status})`);
       }
 
-      const data: { reply: string | CounsellorSuggestion; last_topic?: string } = await res.json();
-      
+      const aiId = (Date.now() + 1).toString();
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let streamed = '';
+      let started = false;
+      let finalReply: string | CounsellorSuggestion | undefined;
+
+      while (finalReply === undefined) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary: number;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const block = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          const dataLine = block.split('\n').find(line => line.startsWith('data: '));
+          if (!dataLine) continue;
+          const event = JSON.parse(dataLine.slice(6));
+          if (event.type === 'token') {
+            streamed += event.delta;
+            const text = streamed;
+            if (!started) {
+              started = true;
+              setIsTyping(false);
+              setMessages(prev => [...prev, { id: aiId, content: text, sender: 'ai', timestamp: new Date() }]);
+            } else {
+              setMessages(prev => prev.map(m => (m.id === aiId ? { ...m, content: text } : m)));
+            }
+          } else if (event.type === 'done') {
+            finalReply = event.reply;
+          } else if (event.type === 'error') {
+            throw new Error(event.detail || 'Stream error');
+          }
+        }
+      }
+
+      if (finalReply === undefined) throw new Error('Stream ended before the reply was complete');
+      const reply = finalReply;
+
       // Check if this is a counsellor suggestion
-      if (typeof data.reply === 'object' && data.reply.type === 'counsellor_suggestion') {
+      if (typeof reply === 'object' && reply.type === 'counsellor_suggestion') {
         // Show the counsellor suggestion modal
-        setCounsellorSuggestion(data.reply);
+        setCounsellorSuggestion(reply);
         setShowCounsellorModal(true);
         
         // Also add the message to chat history
         const aiResponse: Message = {
-          id: (Date.now() + 1).toString(),
-          content: data.reply,
+          id: aiId,
+          content: reply,
           sender: 'ai',
           timestamp: new Date()
         };
         setMessages(prev => [...prev, aiResponse]);
+      } else if (started) {
+        // Replace the streamed text with the final reply
+        setMessages(prev => prev.map(m => (m.id === aiId ? { ...m, content: reply } : m)));
       } else {
         // Regular text response
         const aiResponse: Message = {
-          id: (Date.now() + 1).toString(),
-          content: data.reply,
+          id: aiId,
+          content: reply,
           sender: 'ai',
           timestamp: new Date()
         };
         setMessages(prev => [...prev, aiResponse]);
       }
       
-      setLastTopic(data.last_topic);
+      setLastTopic(undefined);
     } catch (e: any) {
       // For high-risk messages, show emergency fallback instead of generic response
       const lowerInput = inputMessage.toLowerCase();
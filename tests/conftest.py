@@ -0,0 +1,37 @@
+import asyncio
+
+import httpx
+import pytest
+
+import chatbot
+from admission import AdmissionController
+from helpers import no_model
+from intent_cascade import IntentCascade
+from intent_engine import IntentEngine
+from response_cache import ResponseCache
+from session_store import MemorySessionStore
+
+
+@pytest.fixture()
+def keyword_intents(monkeypatch):
+    """Intent classification without the zero-shot model or seed examples: keyword fallback only."""
+    cascade = IntentCascade(IntentEngine(backend_factory=no_model), [])
+    monkeypatch.setattr(chatbot, "intent_cascade", cascade)
+    return cascade
+
+
+@pytest.fixture()
+def isolated_chatbot(keyword_intents, monkeypatch):
+    """Fresh per-test chatbot state: keyword intents, no reply cache, empty sessions, admission with room to spare."""
+    monkeypatch.setattr(chatbot, "response_cache", ResponseCache(capacity=0))
+    monkeypatch.setattr(chatbot, "session_store", MemorySessionStore())
+    monkeypatch.setattr(chatbot, "admission", AdmissionController(limit=32, max_queue=32, queue_budget=60))
+
+
+@pytest.fixture()
+def client():
+    """In-process client for server.main's app; the lifespan (and so warm-up) does not run."""
+    import server.main as server_main
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server_main.app), base_url="http://test")
+    yield client
+    asyncio.run(client.aclose())
@@ -0,0 +1,11 @@
+"""Stand-ins shared by the test modules; fixtures live in conftest.py."""
+
+
+class FakeResp:
+    """Shaped like the agno RunResponse; chatbot.py only reads .content."""
+    def __init__(self, content: str):
+        self.content = content
+
+
+def no_model():
+    raise ImportError("no transformers in tests")
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import chatbot
+from admission import AdmissionController
+from helpers import FakeResp
+
+
+class SlowAsyncAgent:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    async def arun(self, query: str, max_tokens: int = 128):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return FakeResp("model reply")
+
+
+def test_admits_up_to_limit_then_queues_within_budget():
+    ctl = AdmissionController(limit=2, max_queue=10, queue_budget=1.0, initial_service_time=1.0)
+    tickets = [ctl.try_admit() for _ in range(2)]
+    assert all(tickets)
+    # Third call waits ~half a service time for one of two slots: within budget
+    assert ctl.try_admit() is not None
+    # Fourth would wait ~1s, fifth ~1.5s: over budget
+    assert ctl.try_admit() is not None
+    assert ctl.try_admit() is None
+    assert ctl.stats()["shed_over_budget"] == 1
+
+
+def test_queue_bound():
+    ctl = AdmissionController(limit=1, max_queue=1, queue_budget=100, initial_service_time=0.01)
+    assert ctl.try_admit() and ctl.try_admit()
+    assert ctl.try_admit() is None
+    assert ctl.stats()["shed_queue_full"] == 1
+
+
+def test_release_frees_capacity_and_tracks_service_time():
+    ctl = AdmissionController(limit=1, max_queue=0, queue_budget=0, initial_service_time=1.0, smoothing=0.5)
+    ticket = ctl.try_admit()
+    assert ctl.try_admit() is None
+    ctl.release(ticket, service_time=3.0)
+    assert ctl.stats()["avg_service_seconds"] == 2.0
+    assert ctl.try_admit() is not None
+
+
+def test_high_risk_bypasses():
+    ctl = AdmissionController(limit=1, max_queue=0, queue_budget=0)
+    assert ctl.try_admit() is not None
+    ticket = ctl.try_admit("high")
+    assert ticket is not None and ticket.bypass
+    ctl.release(ticket)
+    assert ctl.stats()["active"] == 1
+
+
+def test_spike_is_shed_immediately(isolated_chatbot, monkeypatch):
+    monkeypatch.setattr(chatbot, "admission",
+                        AdmissionController(limit=2, max_queue=2, queue_budget=0.5, initial_service_time=0.5))
+    agent = SlowAsyncAgent(delay=0.5)
+
+    async def one(i):
+        started = time.perf_counter()
+        reply = await chatbot.aprocess_message(agent, f"tell me something #{i}", session_id=f"spike{i}")
+        return reply, time.perf_counter() - started
+
+    async def main():
+        return await asyncio.gather(*[one(i) for i in range(10)])
+
+    results = asyncio.run(main())
+    served = [r for r, _ in results if r == "model reply"]
+    shed = [(r, t) for r, t in results if r != "model reply"]
+    assert 2 <= len(served) <= 4
+    assert shed and all(t < 0.1 for _, t in shed)
+    assert agent.calls == len(served)
+    assert chatbot.admission.stats()["shed"] == len(shed)
+
+
+def test_service_time_excludes_slot_wait(monkeypatch):
+    from llm_executor import LLMExecutor
+
+    ctl = AdmissionController(limit=4, max_queue=10, queue_budget=60, initial_service_time=0.0, smoothing=1.0)
+    samples = []
+    release = ctl.release
+    monkeypatch.setattr(ctl, "release", lambda ticket, service_time=None: (samples.append(service_time),
+                                                                            release(ticket, service_time)))
+    monkeypatch.setattr(chatbot, "admission", ctl)
+    monkeypatch.setattr(chatbot, "llm_executor", LLMExecutor(max_concurrency=1))
+    agent = SlowAsyncAgent(delay=0.2)
+
+    async def main():
+        # One model slot: the second call waits ~0.2s for it before generating for ~0.2s
+        await asyncio.gather(*[chatbot.arun_with_timeout(agent, f"q{i}", timeout=5) for i in range(2)])
+
+    asyncio.run(main())
+    assert len(samples) == 2
+    assert all(0.15 < s < 0.3 for s in samples)
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import pytest
+
+import chatbot
+from helpers import FakeResp
+
+
+pytestmark = pytest.mark.usefixtures("isolated_chatbot")
+
+
+class SlowAsyncAgent:
+    """Async stand-in for the agno Agent: every .arun() takes `delay` seconds."""
+    def __init__(self, delay: float = 0.2, reply: str = "ok"):
+        self.delay = delay
+        self.reply = reply
+        self.cancelled = 0
+
+    async def arun(self, query: str, max_tokens: int = 128):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return FakeResp(self.reply)
+
+
+class SlowSyncAgent:
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+
+    def run(self, query: str, max_tokens: int = 128):
+        time.sleep(self.delay)
+        return FakeResp("sync ok")
+
+
+def test_concurrent_messages_overlap():
+    agent = SlowAsyncAgent(delay=0.2)
+
+    async def main():
+        started = time.perf_counter()
+        replies = await asyncio.gather(*[
+            chatbot.aprocess_message(agent, f"tell me something nice #{i}", session_id=f"a{i}") for i in range(10)
+        ])
+        return replies, time.perf_counter() - started
+
+    replies, elapsed = asyncio.run(main())
+    assert replies == ["ok"] * 10
+    assert elapsed < 1.0
+
+
+def test_sync_agent_runs_off_loop():
+    async def main():
+        return await asyncio.gather(*[
+            chatbot.aprocess_message(SlowSyncAgent(0.2), "tell me something nice", session_id=f"s{i}") for i in range(4)
+        ])
+
+    started = time.perf_counter()
+    assert asyncio.run(main()) == ["sync ok"] * 4
+    assert time.perf_counter() - started < 0.7
+
+
+def test_timeout_cancels_and_falls_back():
+    agent = SlowAsyncAgent(delay=5)
+
+    async def main():
+        return await chatbot.arun_with_timeout(agent, "q", timeout=0.05)
+
+    assert asyncio.run(main()) in chatbot.FALLBACK_RESPONSES
+    assert agent.cancelled == 1
+
+
+def test_canned_and_high_risk_skip_model():
+    agent = SlowAsyncAgent(delay=5)
+    assert asyncio.run(chatbot.aprocess_message(agent, "hello")).startswith("Hello!")
+    reply = asyncio.run(chatbot.aprocess_message(agent, "I want to kill myself"))
+    assert reply["type"] == "counsellor_suggestion"
+
+
+def test_health_answers_during_slow_chat(client, monkeypatch):
+    import server.main as server_main
+
+    monkeypatch.setattr(server_main, "agent", SlowAsyncAgent(delay=0.5))
+
+    async def main():
+        chat = asyncio.create_task(client.post("/api/chat", json={"message": "tell me something nice"}))
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        health = await client.get("/health")
+        health_elapsed = time.perf_counter() - started
+        return (await chat).json(), health.json(), health_elapsed
+
+    chat, health, health_elapsed = asyncio.run(main())
+    assert chat["reply"] == "ok"
+    assert health == {"ok": True}
+    assert health_elapsed < 0.1
@@ -0,0 +1,115 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+import batch_classify
+import chatbot
+from admission import AdmissionController
+from helpers import FakeResp
+
+
+pytestmark = pytest.mark.usefixtures("isolated_chatbot")
+
+
+class EchoAgent:
+    async def arun(self, query: str, max_tokens: int = 128):
+        await asyncio.sleep(0.01)
+        return FakeResp(query.split("\n")[0])
+
+
+@pytest.fixture()
+def post(client, monkeypatch):
+    """POST to the app with an echoing agent; returns the response."""
+    import server.main as server_main
+    monkeypatch.setattr(server_main, "agent", EchoAgent())
+    return lambda path, body: asyncio.run(client.post(path, json=body))
+
+
+def test_classify_texts():
+    high, medium, greeting = chatbot.classify_texts(["I want to kill myself", "I feel so hopeless", "hello"])
+    assert high["risk"] == "high" and "kill myself" in high["matched_phrases"]
+    assert medium["risk"] == "medium"
+    assert greeting == {"label": "general", "intent": "greeting", "risk": "low", "matched_phrases": []}
+
+
+def test_classify_endpoint_matches_frontend_contract(post):
+    resp = post("/api/classify", {"text": "I'm worried about everything"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["intent"] == "mental_health" and data["label"] == "mental health"
+    assert set(data) == {"label", "intent", "risk", "matched_phrases"}
+
+
+def test_classify_batch_preserves_order(post):
+    texts = ["hello", "I want to kill myself", "see you tomorrow"]
+    resp = post("/api/classify/batch", {"texts": texts})
+    assert [r["intent"] for r in resp.json()["results"]] == ["greeting", chatbot.classify_intent_fallback(texts[1]), "goodbye"]
+    assert resp.json()["results"][1]["risk"] == "high"
+
+
+def test_batch_limits(post, monkeypatch):
+    assert post("/api/classify/batch", {"texts": []}).status_code == 400
+    # Blank items are rejected the same way /api/classify rejects a blank text
+    resp = post("/api/classify/batch", {"texts": ["hello", "   "]})
+    assert resp.status_code == 400 and resp.json()["detail"] == "Empty text at index 1"
+    monkeypatch.setattr("server.main.BATCH_MAX_ITEMS", 2)
+    assert post("/api/classify/batch", {"texts": ["a", "b", "c"]}).status_code == 413
+
+
+def test_chat_batch(post):
+    messages = [{"message": f"tell me about topic {i}", "session_id": f"b{i}"} for i in range(5)]
+    messages.append({"message": "I want to kill myself"})
+    resp = post("/api/chat/batch", {"messages": messages})
+    results = resp.json()["results"]
+    assert [r["reply"] for r in results[:5]] == [f"Student said: tell me about topic {i}" for i in range(5)]
+    assert results[5]["reply"]["type"] == "counsellor_suggestion"
+
+
+def test_chat_batch_larger_than_the_limit_is_not_shed(post, monkeypatch):
+    # No queue at all: anything the batch sent past the limit at once would be shed
+    monkeypatch.setattr(chatbot, "admission", AdmissionController(limit=4, max_queue=0, queue_budget=0))
+    messages = [{"message": f"tell me about topic {i}", "session_id": f"b{i}"} for i in range(40)]
+    resp = post("/api/chat/batch", {"messages": messages})
+    assert [r["reply"] for r in resp.json()["results"]] == [f"Student said: tell me about topic {i}" for i in range(40)]
+    assert chatbot.admission.stats()["shed"] == 0
+
+
+def test_chat_batch_runs_a_session_in_order(client, monkeypatch):
+    import server.main as server_main
+    calls = []
+
+    class RecordingAgent:
+        async def arun(self, query: str, max_tokens: int = 128):
+            word = query.split()[2]
+            calls.append(f"start {word}")
+            await asyncio.sleep(0.01 if word == "first" else 0)
+            calls.append(f"end {word}")
+            return FakeResp("ok")
+
+    monkeypatch.setattr(server_main, "agent", RecordingAgent())
+    messages = [{"message": f"{word} thing on my mind", "session_id": "same"} for word in ("first", "second", "third")]
+
+    assert asyncio.run(client.post("/api/chat/batch", json={"messages": messages})).status_code == 200
+    assert calls == ["start first", "end first", "start second", "end second", "start third", "end third"]
+
+
+def test_cli_streams_in_order():
+    lines = [json.dumps({"request_id": f"r{i}", "body": "hello" if i % 2 else "I feel hopeless"}) for i in range(40)]
+    out = io.StringIO()
+    n = batch_classify.process(io.StringIO("\n".join(lines) + "\n"), out, workers=2, chunk_size=3, window=2)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert n == 40 and [r["request_id"] for r in rows] == [f"r{i}" for i in range(40)]
+    assert rows[0]["classification"]["risk"] == "medium"
+    assert rows[1]["classification"]["intent"] == "greeting"
+
+
+def test_cli_skips_malformed_lines():
+    src = io.StringIO('{"body": "hello"}\n{"body": "hel\n[1, 2]\n\n"see you tomorrow"\n')
+    out, errors = io.StringIO(), io.StringIO()
+    n = batch_classify.process(src, out, workers=1, chunk_size=2, errors=errors)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert n == 2 and [r["classification"]["intent"] for r in rows] == ["greeting", "goodbye"]
+    report = errors.getvalue().splitlines()
+    assert len(report) == 2 and report[0].startswith("line 2: invalid JSON") and report[1].startswith("line 3: expected")
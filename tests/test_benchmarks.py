@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import threading
+import time
+
+import ollama
+import pytest
+
+import chatbot
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.perf_report import add_arguments, compare, finish, load_baseline, percentile, summarize
+
+
+@pytest.fixture()
+def fake():
+    with FakeOllama(first_token_ms=20, token_ms=1) as server:
+        yield server
+
+
+def test_fake_ollama_chat_and_generate(fake):
+    client = ollama.Client(host=fake.url)
+    reply = client.chat(model="llama3.2", messages=[{"role": "user", "content": "hi"}], options={"num_predict": 4})
+    assert reply.message.content == "That sounds like a" and reply.done
+
+    chunks = list(client.chat(model="llama3.2", messages=[{"role": "user", "content": "hi"}], stream=True,
+                              options={"num_predict": 3}))
+    assert [c.message.content for c in chunks] == ["That ", "sounds ", "like ", ""]
+    assert chunks[-1].done and chunks[-1].eval_count == 3
+
+    assert client.generate(model="llama3.2", prompt="hi", options={"num_predict": 2}).response == "That sounds"
+    assert fake.stats()["requests"] == 3
+
+
+def test_fake_ollama_latency_and_concurrency():
+    with FakeOllama(first_token_ms=100, token_ms=0) as fake:
+        client = ollama.Client(host=fake.url)
+        threads = [threading.Thread(target=client.chat, kwargs={"model": "m", "messages": []}) for _ in range(4)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+    assert 0.1 <= elapsed < 0.35
+    assert fake.stats()["max_in_flight"] == 4
+
+
+def test_agent_talks_to_fake_ollama(fake, isolated_chatbot, monkeypatch):
+    monkeypatch.setenv("OLLAMA_HOST", fake.url)
+    agent = chatbot.make_agent()
+    reply = asyncio.run(chatbot.aprocess_message(agent, "my roommate and I keep arguing", session_id="fake"))
+    assert reply.startswith("That sounds like a lot")
+    assert fake.stats()["requests"] == 1
+
+
+def test_percentiles_and_summary():
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([5], 99) == 5
+    s = summarize("x", [0.001 * i for i in range(1, 101)], seconds=2.0, errors=5)
+    assert s.count == 105 and s.errors == 5 and s.rps == 50.0
+    assert s.p50_ms == pytest.approx(50.5) and s.p99_ms == pytest.approx(99.01)
+
+
+def test_regression_check(tmp_path, capsys):
+    base = summarize("chat/all", [0.010] * 100, seconds=1.0)
+    parser = argparse.ArgumentParser()
+    add_arguments(parser, min_delta_ms=1.0)
+
+    args = parser.parse_args(["--save-baseline", str(tmp_path / "b.json")])
+    assert finish(args, [base]) == 0
+    assert load_baseline(tmp_path / "b.json") == {"chat/all": base}
+
+    args = parser.parse_args(["--baseline", str(tmp_path / "b.json"), "--tolerance", "0.2"])
+    same = summarize("chat/all", [0.0105] * 100, seconds=1.0)
+    assert finish(args, [same, summarize("new", [1.0], seconds=1.0)]) == 0
+
+    slower = summarize("chat/all", [0.020] * 100, seconds=2.0, errors=10)
+    assert finish(args, [slower]) == 1
+    out = capsys.readouterr().out
+    assert "p95_ms 10.000 -> 20.000" in out and "rps 100.0 -> 50.0" in out and "error rate" in out
+
+    # Tiny absolute changes stay within --min-delta-ms even when large in relative terms
+    fast = summarize("fast", [0.0001] * 10, seconds=1.0)
+    assert compare([summarize("fast", [0.0005] * 10, seconds=1.0)], {"fast": fast}, 0.2, min_delta_ms=1.0) == []
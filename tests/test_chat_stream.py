@@ -0,0 +1,113 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import chatbot
+from response_cache import ResponseCache
+
+
+pytestmark = pytest.mark.usefixtures("isolated_chatbot")
+
+
+class FakeEvent:
+    """Shaped like agno's RunContentEvent."""
+    def __init__(self, content: str, event: str = "RunContent"):
+        self.event = event
+        self.content = content
+
+
+class FakeStreamingModelAgent:
+    """Local stand-in for a streaming Ollama model: one token every `token_delay` seconds."""
+    def __init__(self, tokens, token_delay: float = 0.05, first_token_delay: float = 0.0):
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.cancelled = 0
+
+    def arun(self, query: str, stream: bool = False, max_tokens: int = 128):
+        async def events():
+            try:
+                yield FakeEvent("", event="RunStarted")
+                await asyncio.sleep(self.first_token_delay)
+                for token in self.tokens:
+                    await asyncio.sleep(self.token_delay)
+                    yield FakeEvent(token)
+                yield FakeEvent("".join(self.tokens), event="RunCompleted")
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        return events()
+
+
+@pytest.fixture()
+def cache(monkeypatch):
+    cache = ResponseCache(capacity=16)
+    monkeypatch.setattr(chatbot, "response_cache", cache)
+    return cache
+
+
+def collect(agent, message, **kwargs):
+    async def main():
+        started = time.perf_counter()
+        events = []
+        async for event in chatbot.astream_message(agent, message, **kwargs):
+            events.append((time.perf_counter() - started, event))
+        return events
+    return asyncio.run(main())
+
+
+def test_tokens_arrive_before_generation_finishes():
+    agent = FakeStreamingModelAgent(["Try ", "a ", "slow ", "breath."], token_delay=0.1)
+    events = collect(agent, "tell me something calming", session_id="st1")
+    tokens = [e for _, e in events if e["type"] == "token"]
+    assert [t["delta"] for t in tokens] == ["Try ", "a ", "slow ", "breath."]
+    first_token_at = events[0][0]
+    done_at, done = events[-1]
+    assert done == {"type": "done", "reply": "Try a slow breath.", "truncated": False}
+    assert first_token_at < 0.25 < done_at
+
+
+def test_canned_and_crisis_replies_are_not_streamed():
+    agent = FakeStreamingModelAgent(["never"])
+    assert [e for _, e in collect(agent, "hello")] == [{"type": "done", "reply": chatbot.quick_reply("hello")}]
+    (_, crisis), = collect(agent, "I want to kill myself")
+    assert crisis["reply"]["type"] == "counsellor_suggestion"
+
+
+def test_timeout_before_first_token_sends_fallback():
+    agent = FakeStreamingModelAgent(["late"], first_token_delay=5)
+    events = [e for _, e in collect(agent, "tell me something", timeout=0.1)]
+    assert events[-1]["type"] == "done"
+    assert events[-1]["reply"] in chatbot.FALLBACK_RESPONSES
+    assert agent.cancelled == 1
+
+
+def test_timeout_mid_stream_truncates(cache):
+    agent = FakeStreamingModelAgent(["one ", "two ", "three"], token_delay=0.08)
+    events = [e for _, e in collect(agent, "tell me a story", timeout=0.2)]
+    assert events[-1]["truncated"] is True
+    assert events[-1]["reply"].startswith("one ")
+    assert cache.stats()["size"] == 0
+
+
+def test_repeat_stream_served_from_cache(cache):
+    agent = FakeStreamingModelAgent(["cached ", "reply"], token_delay=0.05)
+    collect(agent, "I feel lost", session_id="st2")
+    events = [e for _, e in collect(agent, "i feel lost", session_id="st3")]
+    assert events == [{"type": "token", "delta": "cached reply"},
+                      {"type": "done", "reply": "cached reply", "truncated": False}]
+
+
+def test_sse_endpoint(client, monkeypatch):
+    import server.main as server_main
+
+    monkeypatch.setattr(server_main, "agent", FakeStreamingModelAgent(["Hi ", "there"], token_delay=0.01))
+
+    response = asyncio.run(client.post("/api/chat/stream", json={"message": "tell me a joke"}))
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = [b for b in response.text.split("\n\n") if b]
+    parsed = [(b.split("\n")[0][len("event: "):], json.loads(b.split("\n")[1][len("data: "):])) for b in blocks]
+    assert [name for name, _ in parsed] == ["token", "token", "done"]
+    assert parsed[-1][1]["reply"] == "Hi there"
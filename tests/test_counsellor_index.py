@@ -0,0 +1,133 @@
+import asyncio
+import random
+
+import pytest
+
+import chatbot
+from counsellor_index import LANGUAGE_WEIGHT, Counsellor, CounsellorIndex, RankQuery, base_score, normalize
+
+SPECIALIZATIONS = [
+    "Anxiety & Stress Management", "Depression & Academic Counseling", "Relationship & Peer Support",
+    "Crisis Intervention", "Sleep and Mood Disorders", "Panic / Anxiety", "Mental Health Specialist",
+    "Academic stress", "Distress tolerance", "",
+]
+AFFILIATIONS = ["On-Campus", "Off-Campus", "Student Wellness Center", None, "Campus Mental Health"]
+ANSWERS = [None, "Anxiety", "Depression", "Relationships", "Academics", "Sleep", "Stress", "Panic", "Mood",
+           "On-Campus Support", "Off-Campus", "On-Campus", "Budget", "Experience"]
+
+
+def frontend_rank(counsellors, answers, classified=None, language=None):
+    """Straight port of getRankedCounsellors in src/lib/counsellorRanking.ts, plus the language boost."""
+    ranked = []
+    for c in counsellors:
+        spec, score = normalize(c.specialization), 0.0
+        for text, weight in ((answers.get("q1"), 5), (answers.get("q2"), 3), (answers.get("q3"), 2), (classified, 4)):
+            if text and normalize(text) in spec:
+                score += weight
+        aff, pref, match = normalize(c.affiliation), normalize(answers.get("q3")), False
+        if "on-campus" in pref and "on" in aff:
+            match, score = True, score + 2
+        if "off-campus" in pref and "off" in aff:
+            match, score = True, score + 2
+        if language and language in {normalize(lang) for lang in c.languages}:
+            score += LANGUAGE_WEIGHT
+        score += base_score(c.fees, c.experience_years)
+        ranked.append((round(score, 2), c.experience_years or 0, c.fees or 0, c.id, match))
+    ranked.sort(key=lambda r: (-r[0], -r[1], r[2], r[3]))
+    return [(cid, score, match) for score, _, _, cid, match in ranked]
+
+
+def roster(n, rng):
+    return [
+        Counsellor(
+            id=f"c{i}", name=f"Counsellor {i}", specialization=rng.choice(SPECIALIZATIONS),
+            affiliation=rng.choice(AFFILIATIONS), fees=rng.choice([0, 250, 450, 700, 900, None]),
+            experience_years=rng.choice([None, 1, 4, 5, 12]),
+            languages=tuple(rng.sample(["English", "Hindi", "Tamil", "Gujarati"], 2)), bio="",
+        )
+        for i in range(n)
+    ]
+
+
+def test_matches_frontend_ranking():
+    rng = random.Random(3)
+    counsellors = roster(400, rng)
+    index = CounsellorIndex(counsellors)
+    for _ in range(200):
+        answers = {key: rng.choice(ANSWERS) for key in ("q1", "q2", "q3")}
+        classified = rng.choice([None, "anxiety", "stress", "mental health", "relationship", "general"])
+        language = rng.choice([None, None, "tamil", "english"])
+        k = rng.choice([1, 5, 15, 500])
+        got = index.rank(RankQuery.from_answers(answers, classified, language), k=k)
+        assert [(r.counsellor.id, r.score, r.location_match) for r in got] == frontend_rank(
+            counsellors, answers, classified, language)[:k]
+
+
+def test_sync_applies_a_diff():
+    index = CounsellorIndex()
+    records = [c._asdict() for c in roster(20, random.Random(5))]
+    index.sync(records)
+    assert len(index) == 20
+    version = index.version
+
+    index.sync(records)
+    assert index.version == version
+
+    records[0] = dict(records[0], specialization="Crisis Intervention")
+    del records[1]
+    index.sync(records)
+    assert index.version == version + 2 and len(index) == 19 and index.get("c1") is None
+    crisis = index.rank(RankQuery((("crisis", 1.0),)), k=20)
+    assert "c0" in {r.counsellor.id for r in crisis if r.score >= 1}
+    assert "c1" not in {r.counsellor.id for r in index.rank(RankQuery(), k=50)}
+
+    with pytest.raises(ValueError):
+        index.sync(records + [{"name": "no id"}])
+    assert len(index) == 19
+
+
+def test_language_boost():
+    index = CounsellorIndex([
+        Counsellor("a", "A", "Anxiety", "On-Campus", 0, 10, ("English",), ""),
+        Counsellor("b", "B", "Anxiety", "On-Campus", 0, 1, ("English", "Tamil"), ""),
+    ])
+    assert [r.counsellor.id for r in index.rank(RankQuery.from_answers({"q1": "Anxiety"}), k=2)] == ["a", "b"]
+    boosted = index.rank(RankQuery.from_answers({"q1": "Anxiety"}, language="tamil"), k=2)
+    assert [r.counsellor.id for r in boosted] == ["b", "a"]
+
+
+def test_rank_endpoint(client, monkeypatch):
+    import server.main as server_main
+
+    async def fake_classify(texts):
+        return [{"label": "stress", "intent": "study_stress", "risk": "low", "matched_phrases": []} for _ in texts]
+
+    monkeypatch.setattr(server_main, "aclassify_texts", fake_classify)
+
+    async def main():
+        by_text = await client.post("/api/counsellors/rank", json={
+            "answers": {"q1": "Anxiety", "q3": "On-Campus", "freeText": "exams are too much"}, "k": 2,
+        })
+        by_intent = await client.post("/api/counsellors/rank", json={"intent": "personal_issue", "k": 1})
+        too_many = await client.post("/api/counsellors/rank", json={"k": 100000})
+        return by_text, by_intent, too_many
+
+    by_text, by_intent, too_many = asyncio.run(main())
+    assert by_text.json()["label"] == "stress"
+    top = by_text.json()["results"][0]
+    assert top["id"] == "counsellor_1" and top["location_match"] and top["score"] == 11.5
+    assert top["ranking_score"] == 4.9
+    assert len(by_text.json()["results"]) == 2
+    assert by_intent.json()["label"] == "relationship"
+    assert by_intent.json()["results"][0]["id"] == "counsellor_3"
+    assert too_many.status_code == 422
+    assert chatbot.counsellor_roster.get().stats()["counsellors"] >= 5
+
+
+def test_match_cache_is_bounded():
+    index = CounsellorIndex(roster(50, random.Random(9)))
+    cache = index._specializations._matches
+    for i in range(index._specializations.cache_size * 3):
+        index.rank(RankQuery(((f"free text {i}", 1.0),)), k=1)
+    assert len(cache) == index._specializations.cache_size
+    assert index.rank(RankQuery((("anxiety", 1.0),)), k=1)[0].score >= 1
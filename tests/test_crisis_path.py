@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import pytest
+
+import chatbot
+from counsellor_index import Counsellor, CounsellorIndex
+from intent_cascade import IntentCascade
+from phrase_matcher import WatchedJSON
+
+HIGH_RISK = "I can't do this anymore, I want to kill myself"
+
+
+class ExplodingAgent:
+    def run(self, query, max_tokens=128):
+        raise AssertionError("crisis path reached the LLM")
+
+    async def arun(self, query, max_tokens=128):
+        raise AssertionError("crisis path reached the LLM")
+
+
+class ExplodingEngine:
+    def submit(self, message):
+        raise AssertionError("crisis path reached the intent model")
+
+    def warm_up(self):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def no_models(monkeypatch):
+    monkeypatch.setattr(chatbot, "intent_cascade", IntentCascade(ExplodingEngine(), []))
+    monkeypatch.setattr(chatbot, "classify_intent", ExplodingEngine().submit)
+
+
+def test_high_risk_skips_intent_and_llm():
+    reply = chatbot.process_message(ExplodingAgent(), HIGH_RISK, session_id="c1")
+    assert reply["type"] == "counsellor_suggestion" and reply["counsellors"]
+    assert asyncio.run(chatbot.aprocess_message(ExplodingAgent(), HIGH_RISK)) is reply
+
+
+def test_high_risk_latency_is_sub_millisecond():
+    agent = ExplodingAgent()
+    for _ in range(50):
+        chatbot.process_message(agent, HIGH_RISK)
+    timings = []
+    for _ in range(500):
+        started = time.perf_counter()
+        chatbot.process_message(agent, HIGH_RISK)
+        timings.append(time.perf_counter() - started)
+    assert statistics.median(timings) < 0.001
+
+
+def test_payload_rebuilt_only_when_roster_changes(tmp_path, monkeypatch):
+    path = tmp_path / "counsellors.json"
+    with open(chatbot.data_file_candidates("counsellors.json")[-1], encoding="utf-8") as f:
+        roster = json.load(f)
+    path.write_text(json.dumps(roster), encoding="utf-8")
+    index = CounsellorIndex()
+    monkeypatch.setattr(chatbot, "_crisis_payload", chatbot._crisis_payload)
+    monkeypatch.setattr(chatbot, "counsellor_roster", WatchedJSON(
+        [path], build=lambda data: index.sync(data["counsellors"]), default=lambda: index, interval=0,
+    ))
+
+    first = chatbot.make_counsellor_payload()
+    assert chatbot.make_counsellor_payload() is first
+    assert {c["id"] for c in first["counsellors"]} == {"crisis_1", "crisis_2"}
+
+    # Dropping a crisis counsellor from the roster rebuilds the payload
+    roster["counsellors"] = [c for c in roster["counsellors"] if c["id"] != "crisis_2"]
+    path.write_text(json.dumps(roster), encoding="utf-8")
+    os.utime(path, (time.time() + 5, time.time() + 5))
+    second = chatbot.make_counsellor_payload()
+    assert second is not first and second["counsellors"][0]["id"] == "crisis_1"
+
+    # A roster entry without an id keeps the previous version
+    roster["counsellors"].append({"name": "nobody"})
+    path.write_text(json.dumps(roster), encoding="utf-8")
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    assert chatbot.make_counsellor_payload() is second
+
+
+def test_api_serves_cached_crisis_body(client, monkeypatch):
+    import server.main as server_main
+    monkeypatch.setattr(server_main, "agent", ExplodingAgent())
+
+    async def main():
+        return [await client.post("/api/chat", json={"message": HIGH_RISK}) for _ in range(2)]
+
+    first, second = asyncio.run(main())
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert {c["id"] for c in first.json()["reply"]["counsellors"]} == {"crisis_1", "crisis_2"}
+    # The shown rating is the stored one, the same with or without the roster, not the ranking sum
+    shown = {c["id"]: c["ranking_score"] for c in first.json()["reply"]["counsellors"]}
+    assert shown == {c["id"]: c["ranking_score"] for c in chatbot.CRISIS_FALLBACK_COUNSELLORS}
+    payload = chatbot.make_counsellor_payload()
+    assert server_main.crisis_response(payload)[1] is server_main.crisis_response(payload)[1]
+
+
+def test_crisis_payload_only_complete_crisis_counsellors(tmp_path, client, monkeypatch):
+    import server.main as server_main
+    index = CounsellorIndex([
+        Counsellor("c_null_fees", "A", "Crisis Intervention", "On-Campus", None, 9, ("English",), "", 9.0),
+        Counsellor("c_null_aff", "B", "Emergency Counseling", None, 0, 9, ("English",), "", 9.0),
+        Counsellor("c_no_rating", "E", "Crisis Intervention", "On-Campus", 0, 9, ("English",), ""),
+        Counsellor("c_ok", "C", "Crisis Support", "On-Campus", 0, 3, ("English",), "", 9.0),
+        Counsellor("other", "D", "Anxiety Management", "On-Campus", 0, 20, ("English",), "", 9.0),
+    ])
+    monkeypatch.setattr(chatbot, "_crisis_payload", chatbot._crisis_payload)
+    monkeypatch.setattr(chatbot, "counsellor_roster", WatchedJSON(
+        [tmp_path / "missing.json"], build=index.sync, default=lambda: index,
+    ))
+    monkeypatch.setattr(server_main, "agent", ExplodingAgent())
+
+    # top_k is 2, but the only other candidates are incomplete or not crisis specialists
+    payload = chatbot.make_counsellor_payload()
+    assert [c["id"] for c in payload["counsellors"]] == ["c_ok"]
+
+    assert asyncio.run(client.post("/api/chat", json={"message": HIGH_RISK})).status_code == 200
+
+
+def test_crisis_payload_falls_back_without_roster(tmp_path, monkeypatch):
+    import server.main as server_main
+    empty = CounsellorIndex()
+    monkeypatch.setattr(chatbot, "_crisis_payload", chatbot._crisis_payload)
+    monkeypatch.setattr(chatbot, "counsellor_roster", WatchedJSON(
+        [tmp_path / "missing.json"], build=empty.sync, default=lambda: empty,
+    ))
+    payload = chatbot.make_counsellor_payload()
+    assert payload["counsellors"] == chatbot.CRISIS_FALLBACK_COUNSELLORS
+    server_main.crisis_response(payload)
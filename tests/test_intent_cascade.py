@@ -0,0 +1,83 @@
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+from intent_cascade import CentroidIntentModel, IntentCascade, hashed_features
+
+SEED = Path(__file__).resolve().parent.parent / "data" / "intent_seed.jsonl"
+
+
+class FakeEngine:
+    def __init__(self, label="general"):
+        self.label = label
+        self.calls = []
+
+    def submit(self, message):
+        self.calls.append(message)
+        future = Future()
+        future.set_result(self.label)
+        return future
+
+    def warm_up(self):
+        return True
+
+    def stats(self):
+        return {"calls": len(self.calls)}
+
+
+@pytest.fixture(scope="module")
+def model():
+    return CentroidIntentModel.from_jsonl(SEED)
+
+
+def test_features_are_normalised_and_stable():
+    a = hashed_features("I can't sleep at night")
+    assert a == hashed_features("i CAN'T sleep at night")
+    assert abs(sum(v * v for v in a.values()) - 1.0) < 1e-9
+    assert hashed_features("") == {}
+
+
+@pytest.mark.parametrize("message,label", [
+    ("hello there", "greeting"),
+    ("bye, talk to you later", "goodbye"),
+    ("thanks a lot for the help", "thanks"),
+    ("I feel so anxious and sad all the time", "mental_health"),
+])
+def test_centroid_model_on_obvious_messages(model, message, label):
+    assert model.predict(message).label == label
+
+
+def test_confident_messages_skip_zero_shot(model):
+    engine = FakeEngine()
+    cascade = IntentCascade(engine, [], threshold=0.0, fast_model=model)
+    assert cascade.classify("hello there") == "greeting"
+    assert engine.calls == []
+    assert cascade.stats()["stage_hits"]["fast"] == 1
+
+
+def test_threshold_above_one_always_uses_zero_shot(model):
+    engine = FakeEngine(label="academic")
+    cascade = IntentCascade(engine, [], threshold=1.01, fast_model=model)
+    assert cascade.classify("hello there") == "academic"
+    assert engine.calls == ["hello there"]
+
+
+def test_stage_hit_rates():
+    engine = FakeEngine()
+    cascade = IntentCascade(engine, [SEED], threshold=0.999)
+    cascade.classify("hello there")
+    cascade.classify("zzqx")
+    cascade.record_fallback()
+    stats = cascade.stats()
+    assert sum(stats["stage_hits"].values()) == 3
+    assert stats["stage_hits"]["model"] >= 1 and stats["stage_hits"]["fallback"] == 1
+    assert abs(sum(stats["stage_hit_rates"].values()) - 1.0) < 1e-9
+    assert stats["zero_shot"] == {"calls": len(engine.calls)}
+
+
+def test_missing_seed_set_sends_everything_to_zero_shot():
+    engine = FakeEngine()
+    cascade = IntentCascade(engine, [Path("/nonexistent/seed.jsonl")], threshold=0.0)
+    cascade.classify("hello")
+    assert engine.calls == ["hello"]
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from intent_engine import IntentEngine, IntentModelUnavailable
+
+
+class FakeBackend:
+    """Scores a message 1.0 for the first label whose name appears in it."""
+    def __init__(self, labels):
+        self.labels = labels
+        self.batches = []
+
+    def score(self, messages):
+        self.batches.append(list(messages))
+        rows = []
+        for m in messages:
+            row = [0.0] * len(self.labels)
+            for i, label in enumerate(self.labels):
+                if label in m:
+                    row[i] = 1.0
+                    break
+            rows.append(row)
+        return rows
+
+
+LABELS = ["greeting", "goodbye", "thanks"]
+
+
+@pytest.fixture()
+def backend():
+    return FakeBackend(LABELS)
+
+
+def test_classify_uses_backend(backend):
+    engine = IntentEngine(labels=LABELS, max_wait_ms=0, backend_factory=lambda: backend)
+    assert engine.classify("thanks friend") == "thanks"
+    assert engine.classify("goodbye now") == "goodbye"
+
+
+def test_model_loaded_once(backend):
+    loads = []
+
+    def factory():
+        loads.append(1)
+        return backend
+
+    engine = IntentEngine(labels=LABELS, max_wait_ms=0, backend_factory=factory)
+    assert engine.warm_up()
+    engine.classify_batch(["greeting"] * 5)
+    assert len(loads) == 1
+
+
+def test_concurrent_requests_are_batched(backend):
+    engine = IntentEngine(labels=LABELS, batch_size=32, max_wait_ms=50, backend_factory=lambda: backend)
+    engine.warm_up()
+    backend.batches.clear()
+
+    results = [None] * 12
+    start = threading.Barrier(12)
+
+    def worker(i):
+        start.wait()
+        results[i] = engine.classify("goodbye" if i % 2 else "thanks")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["thanks", "goodbye"] * 6
+    assert len(backend.batches) < 12
+    assert engine.stats()["avg_batch_size"] > 1
+
+
+def test_batch_size_is_respected(backend):
+    engine = IntentEngine(labels=LABELS, batch_size=4, max_wait_ms=50, backend_factory=lambda: backend)
+    engine.classify_batch(["thanks"] * 10)
+    assert all(len(b) <= 4 for b in backend.batches)
+
+
+def test_unavailable_model_fails_fast():
+    def factory():
+        raise ImportError("no transformers")
+
+    engine = IntentEngine(labels=LABELS, backend_factory=factory)
+    assert engine.warm_up() is False
+    with pytest.raises(IntentModelUnavailable):
+        engine.classify("hello")
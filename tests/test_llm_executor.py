@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from helpers import FakeResp
+from llm_executor import LLMExecutor, LLMTimeout
+
+
+class AsyncAgent:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.cancelled = 0
+
+    async def arun(self, query: str, max_tokens: int = 128):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return FakeResp(query)
+
+
+class BlockingAgent:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.finished = threading.Event()
+
+    def run(self, query: str, max_tokens: int = 128):
+        time.sleep(self.delay)
+        self.finished.set()
+        return FakeResp(query)
+
+
+def test_returns_result():
+    executor = LLMExecutor(max_concurrency=2)
+    assert executor.run(AsyncAgent(0.01), "hi").content == "hi"
+    assert executor.run(BlockingAgent(0.01), "yo").content == "yo"
+    assert executor.stats()["completed"] == 2
+
+
+def test_deadline_aborts_async_generation():
+    executor = LLMExecutor(max_concurrency=2)
+    agent = AsyncAgent(5)
+    started = time.perf_counter()
+    with pytest.raises(LLMTimeout):
+        executor.run(agent, "slow", timeout=0.05)
+    assert time.perf_counter() - started < 0.5
+    assert agent.cancelled == 1
+    assert executor.stats()["cancelled"] == 1
+    assert executor.stats()["timeouts"] == 1
+
+
+def test_blocking_agent_does_not_hold_caller():
+    executor = LLMExecutor(max_concurrency=2)
+    agent = BlockingAgent(0.5)
+    started = time.perf_counter()
+    with pytest.raises(LLMTimeout):
+        executor.run(agent, "slow", timeout=0.05)
+    assert time.perf_counter() - started < 0.3
+    assert not agent.finished.is_set()
+    assert executor.stats()["abandoned"] == 1
+
+
+def test_abandoned_thread_keeps_its_slot():
+    executor = LLMExecutor(max_concurrency=1)
+    slow = BlockingAgent(0.4)
+    with pytest.raises(LLMTimeout):
+        executor.run(slow, "slow", timeout=0.05)
+    assert executor.stats()["abandoned_running"] == 1 and executor.stats()["in_flight"] == 0
+
+    async def main():
+        # The only slot is still taken by the abandoned thread: the next call waits visibly in the queue
+        call = asyncio.ensure_future(executor.arun(BlockingAgent(0.01), "next", timeout=2))
+        await asyncio.sleep(0.1)
+        assert executor.stats()["queue_depth"] == 1
+        return await call
+
+    assert asyncio.run(main()).content == "next"
+    assert slow.finished.is_set()
+    assert executor.stats()["abandoned_running"] == 0
+
+
+def test_concurrency_is_bounded_and_queue_counts_toward_deadline():
+    executor = LLMExecutor(max_concurrency=1)
+    agent = AsyncAgent(0.3)
+
+    async def main():
+        first = asyncio.ensure_future(executor.arun(agent, "a", timeout=2))
+        await asyncio.sleep(0.05)
+        assert executor.stats()["in_flight"] == 1
+        second = asyncio.ensure_future(executor.arun(agent, "b", timeout=0.1))
+        await asyncio.sleep(0.02)
+        assert executor.stats()["queue_depth"] == 1
+        with pytest.raises(LLMTimeout):
+            await second
+        return await first
+
+    assert asyncio.run(main()).content == "a"
+    assert agent.cancelled == 0
+    assert executor.stats()["timeouts"] == 1
@@ -0,0 +1,92 @@
+import json
+import logging
+import queue
+import threading
+import time
+
+import log_pipeline
+from log_pipeline import DroppingQueueHandler, JsonFormatter, SamplingFilter, SizeAndTimeRotatingFileHandler
+
+
+def record(level=logging.INFO, msg="hello %s", args=("there",), **extra):
+    rec = logging.LogRecord("chatbot", level, __file__, 1, msg, args, None)
+    rec.__dict__.update(extra)
+    return rec
+
+
+def test_json_formatter_includes_extras():
+    line = JsonFormatter().format(record(session_id="s1", intent="greeting", risk="low"))
+    data = json.loads(line)
+    assert data["msg"] == "hello there" and data["level"] == "INFO" and data["logger"] == "chatbot"
+    assert (data["session_id"], data["intent"], data["risk"]) == ("s1", "greeting", "low")
+    assert "args" not in data and "lineno" not in data
+
+
+def test_sampling_keeps_warnings():
+    f = SamplingFilter(rate=0.0)
+    assert not f.filter(record())
+    assert f.filter(record(level=logging.WARNING))
+    assert SamplingFilter(rate=1.0).filter(record())
+
+
+def test_rotates_on_size(tmp_path):
+    path = tmp_path / "app.log"
+    handler = SizeAndTimeRotatingFileHandler(str(path), maxBytes=200, backupCount=2)
+    for i in range(20):
+        handler.emit(record(msg="line %d padded out to some length", args=(i,)))
+    handler.close()
+    assert (tmp_path / "app.log.1").exists() and (tmp_path / "app.log.2").exists()
+    assert not (tmp_path / "app.log.3").exists()
+
+
+def test_rotates_on_time(tmp_path):
+    path = tmp_path / "app.log"
+    handler = SizeAndTimeRotatingFileHandler(str(path), backupCount=1, interval=0.05)
+    handler.emit(record())
+    time.sleep(0.06)
+    handler.emit(record())
+    handler.close()
+    assert (tmp_path / "app.log.1").read_text().count("hello there") == 1
+
+
+def test_queue_handler_never_blocks():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    started = time.perf_counter()
+    for _ in range(100):
+        handler.handle(record())
+    assert time.perf_counter() - started < 0.1
+    assert handler.dropped == 98
+
+
+class SlowHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.gate = threading.Event()
+
+    def emit(self, rec):
+        self.gate.wait(1)
+        self.records.append(rec)
+
+
+def test_setup_writes_off_the_calling_thread(tmp_path, monkeypatch):
+    slow = SlowHandler()
+    monkeypatch.setenv("LOG_FILE", str(tmp_path / "chat.log"))
+    monkeypatch.setenv("LOG_CONSOLE", "0")
+    monkeypatch.setattr(log_pipeline, "build_handlers", lambda: [slow])
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    try:
+        log_pipeline.setup_logging(force=True)
+        started = time.perf_counter()
+        for i in range(50):
+            logging.getLogger("chatbot").info("message %d", i, extra={"session_id": "s"})
+        assert time.perf_counter() - started < 0.5
+        slow.gate.set()
+        log_pipeline.shutdown_logging()
+        assert len(slow.records) == 50
+        assert slow.records[0].session_id == "s"
+    finally:
+        log_pipeline.shutdown_logging()
+        root.handlers[:], _ = saved
+        root.setLevel(saved[1])
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+
+import pytest
+
+import chatbot
+import metrics
+from helpers import FakeResp
+from metrics import Histogram, Registry
+
+
+pytestmark = pytest.mark.usefixtures("isolated_chatbot")
+
+
+class QuickAgent:
+    async def arun(self, query: str, max_tokens: int = 128):
+        await asyncio.sleep(0.01)
+        return FakeResp("hang in there")
+
+
+def test_histogram_exposition():
+    h = Histogram("t_seconds", "test", ["stage"], buckets=(0.1, 1.0))
+    h.observe(0.05, stage="a")
+    h.observe(0.5, stage="a")
+    h.observe(3.0, stage="a")
+    lines = h.render()
+    assert 't_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 't_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="a"} 3' in lines
+    assert h.count(stage="a") == 3
+
+
+def test_registry_renders_counters_and_gauges():
+    registry = Registry()
+    c = registry.counter("t_total", "test", ["kind"])
+    c.inc(kind="x")
+    c.inc(2, kind="x")
+    registry.gauges("t_comp", lambda: {"depth": 3, "available": True, "name": "n"})
+    text = registry.render()
+    assert 't_total{kind="x"} 3' in text
+    assert "t_comp_depth 3" in text
+    assert "available" not in text and "t_comp_name" not in text
+    assert registry.counter("t_total", "test", ["kind"]) is c
+
+    registry.gauges("t_comp", lambda: {"depth": 4})
+    text = registry.render()
+    assert text.count("# TYPE t_comp_depth gauge") == 1 and "t_comp_depth 4" in text
+
+
+def test_sampled_trace_logs_stage_timings(caplog):
+    with caplog.at_level(logging.INFO, logger="metrics"):
+        with metrics.traced("unit", sample_rate=1.0):
+            with metrics.stage("one"):
+                metrics.annotate(risk="low")
+        with metrics.traced("unit", sample_rate=0.0):
+            with metrics.stage("two"):
+                pass
+    traces = [r.trace for r in caplog.records if hasattr(r, "trace")]
+    assert len(traces) == 1
+    assert traces[0]["kind"] == "unit" and traces[0]["risk"] == "low"
+    assert [name for name, _ in traces[0]["stages"]] == ["one"]
+
+
+def test_process_message_counts_stages_and_outcomes():
+    before_crisis = metrics.REPLY_TOTAL.value(source="crisis")
+    before_risk = metrics.STAGE_SECONDS.count(stage="risk")
+    before_intent = metrics.STAGE_SECONDS.count(stage="intent")
+    chatbot.process_message(QuickAgent(), "I want to kill myself", session_id="m1")
+    assert metrics.REPLY_TOTAL.value(source="crisis") == before_crisis + 1
+    assert metrics.STAGE_SECONDS.count(stage="risk") == before_risk + 1
+    assert metrics.STAGE_SECONDS.count(stage="intent") == before_intent
+
+
+def test_metrics_endpoint(client, monkeypatch):
+    import server.main as server_main
+    monkeypatch.setattr(server_main, "agent", QuickAgent())
+
+    async def main():
+        chat = await client.post("/api/chat", json={"message": "tell me something nice"})
+        return chat, await client.get("/metrics")
+
+    chat, resp = asyncio.run(main())
+    assert chat.json() == {"reply": "hang in there", "last_topic": None}
+    assert resp.headers["content-type"].startswith("text/plain")
+    for stage in ("handler", "serialize", "intent", "llm", "llm_queue", "llm_generate"):
+        assert f'pulse_stage_seconds_count{{stage="{stage}"}}' in resp.text
+    assert 'pulse_replies_total{source="model"}' in resp.text
+    assert "pulse_llm_max_concurrency" in resp.text
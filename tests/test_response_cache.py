@@ -0,0 +1,132 @@
+import sqlite3
+import time
+
+import pytest
+
+import chatbot
+from helpers import FakeResp
+from response_cache import ResponseCache, normalize_message
+
+
+class FakeModel:
+    id = "fake-llm"
+    options = {"temperature": 0.2}
+
+
+class CountingAgent:
+    model = FakeModel()
+    instructions = "be kind"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def run(self, query: str, max_tokens: int = 128):
+        self.calls += 1
+        time.sleep(self.delay)
+        return FakeResp(f"reply {self.calls}")
+
+
+@pytest.fixture()
+def cache(keyword_intents, monkeypatch):
+    cache = ResponseCache(capacity=16, ttl=60)
+    monkeypatch.setattr(chatbot, "response_cache", cache)
+    return cache
+
+
+def test_normalization():
+    assert normalize_message("  I can't   FOCUS!! ") == "i can't focus"
+    assert ResponseCache.key("I can't focus.", "m") == ResponseCache.key("i can't focus", "m")
+    assert ResponseCache.key("I can't focus", "m") != ResponseCache.key("I can't focus", "other")
+    assert ResponseCache.key("x", "m", {"temperature": 0.2}) != ResponseCache.key("x", "m", {"temperature": 0.9})
+
+
+def test_lru_and_ttl():
+    cache = ResponseCache(capacity=2, ttl=60)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+
+    cache.ttl = 0
+    time.sleep(0.01)
+    assert cache.get("a") is None
+
+
+def test_persists_across_restarts(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = ResponseCache(capacity=8, ttl=60, path=path)
+    cache.put("k", "stored reply", latency=1.5)
+    assert cache.flush(timeout=5)
+    reopened = ResponseCache(capacity=8, ttl=60, path=path)
+    assert reopened.get("k") == "stored reply"
+    assert reopened.stats()["latency_saved_seconds"] == 1.5
+
+
+def test_disk_copy_is_bounded(tmp_path, monkeypatch):
+    path = str(tmp_path / "responses.db")
+    cache = ResponseCache(capacity=3, ttl=60, path=path)
+    for i in range(10):
+        cache.put(f"k{i}", f"reply {i}")
+    assert cache.flush(timeout=5)
+
+    def on_disk():
+        db = sqlite3.connect(path)
+        try:
+            return {row[0] for row in db.execute("SELECT key FROM responses")}
+        finally:
+            db.close()
+
+    # What the LRU evicts is deleted from disk as well
+    assert on_disk() == {"k7", "k8", "k9"}
+
+    # Expired rows go at the next periodic prune
+    monkeypatch.setattr(ResponseCache, "PRUNE_INTERVAL", 0.05)
+    pruning = ResponseCache(capacity=3, ttl=60, path=path)
+    pruning.ttl = 0
+    pruning.put("fresh", "reply")
+    time.sleep(0.2)
+    assert pruning.flush(timeout=5)
+    assert on_disk() == set()
+
+
+def test_put_does_not_wait_for_disk(tmp_path):
+    cache = ResponseCache(capacity=8, ttl=60, path=str(tmp_path / "responses.db"))
+    cache.put("warm", "up")
+    assert cache.flush(timeout=5)
+    writer = sqlite3.connect(str(tmp_path / "responses.db"), isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")  # hold the write lock like a busy sibling worker
+    try:
+        started = time.perf_counter()
+        cache.put("k", "reply")
+        assert time.perf_counter() - started < 0.1
+        assert cache.get("k") == "reply" and cache.stats()["pending_writes"] <= 1
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+    assert cache.flush(timeout=10)
+
+
+def test_repeat_message_served_from_cache(cache):
+    agent = CountingAgent(delay=0.05)
+    first = chatbot.process_message(agent, "I feel lost lately", session_id="c1")
+    second = chatbot.process_message(agent, "i feel lost lately!", session_id="c2")
+    assert first == second == "reply 1"
+    assert agent.calls == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["hit_ratio"] == 0.5
+    assert stats["latency_saved_seconds"] >= 0.05
+
+
+def test_fallbacks_are_not_cached(cache):
+    agent = CountingAgent(delay=0.3)
+    reply = chatbot.run_with_timeout(agent, "q", timeout=0.05, cache_key="k")
+    assert reply in chatbot.FALLBACK_RESPONSES
+    assert cache.get("k") is None
+
+
+def test_high_risk_never_cached(cache):
+    assert chatbot.response_cache_key(CountingAgent(), "I want to kill myself", "high") is None
+    assert chatbot.response_cache_key(CountingAgent(), "I feel lost", "low") is not None
@@ -0,0 +1,78 @@
+import json
+import os
+import re
+
+import pytest
+
+from phrase_matcher import RiskMatcher, WatchedJSON
+
+
+def loop_classify(words, text):
+    text_lower = text.lower()
+    for word in words["high_risk"]:
+        if re.search(rf"\b{re.escape(word)}\b", text_lower):
+            return "high"
+    for word in words["medium_risk"]:
+        if re.search(rf"\b{re.escape(word)}\b", text_lower):
+            return "medium"
+    return "low"
+
+
+@pytest.fixture()
+def words():
+    with open(os.path.join(os.path.dirname(__file__), "..", "data", "distress_words.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    return {tier: [w.lower() for w in data[tier]] for tier in ("high_risk", "medium_risk")}
+
+
+@pytest.mark.parametrize("text", [
+    "I want to kill myself",
+    "I can't take it anymore, this is the end",
+    "I'm really sad and lonely",
+    "Had a panic attack before the exam",
+    "I panicked a bit but I'm fine",
+    "My phone is stuck on the boot screen",
+    "I'm stuckk",
+    "Hello there!",
+    "Wish I was dead honestly",
+    "",
+])
+def test_matches_per_phrase_search(words, text):
+    assert RiskMatcher.from_dict(words).scan(text).tier == loop_classify(words, text)
+
+
+def test_word_boundaries():
+    matcher = RiskMatcher(["noose"], ["numb"])
+    assert matcher.scan("numbers are hard").tier == "low"
+    assert matcher.scan("I feel numb.").tier == "medium"
+
+
+def test_high_tier_wins_on_shared_prefix():
+    # The longer medium phrase must not hide the high phrase starting at the same position
+    matcher = RiskMatcher(["end it"], ["end it all tonight maybe"])
+    result = matcher.scan("I just want to end it all tonight")
+    assert result.tier == "high"
+    assert result.phrases == ["end it"]
+
+
+def test_returns_all_matched_phrases():
+    matcher = RiskMatcher(["want to die"], ["lonely", "exhausted"])
+    result = matcher.scan("So exhausted and lonely, I want to die")
+    assert result.tier == "high"
+    assert result.phrases == ["exhausted", "lonely", "want to die"]
+
+
+def test_hot_reload(tmp_path):
+    path = tmp_path / "distress_words.json"
+    path.write_text(json.dumps({"high_risk": [], "medium_risk": ["tired"]}))
+    watched = WatchedJSON([path], build=RiskMatcher.from_dict, default=lambda: RiskMatcher([], []), interval=0)
+    assert watched.get().scan("so tired").tier == "medium"
+
+    path.write_text(json.dumps({"high_risk": ["tired"], "medium_risk": []}))
+    os.utime(path, (1, 1))
+    assert watched.get().scan("so tired").tier == "high"
+
+    # A broken edit keeps serving the last good matcher
+    path.write_text("{not json")
+    os.utime(path, (2, 2))
+    assert watched.get().scan("so tired").tier == "high"
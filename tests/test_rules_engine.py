@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+import chatbot
+from phrase_matcher import WatchedJSON
+from rules_engine import RuleSet
+
+
+@pytest.fixture()
+def rules():
+    with open(os.path.join(os.path.dirname(__file__), "..", "data", "quick_responses.json"), encoding="utf-8") as f:
+        return RuleSet.from_dict(json.load(f))
+
+
+@pytest.mark.parametrize("message,rule_id", [
+    ("hi", "greeting"),
+    ("Hello!", "greeting"),
+    ("thank you so much", "thanks"),
+    ("I'm so anxious about tomorrow", "anxiety"),
+    ("exam stress is killing my sleep", "stress"),
+    ("I can't sleep", "sleep"),
+    ("it's all too much", "overwhelmed"),
+    ("feeling down today", "low_mood"),
+    ("my girlfriend and I fought", "relationship"),
+    ("I feel so alone and anxious", "anxiety"),
+])
+def test_reply_rules(rules, message, rule_id):
+    assert rules.match(message).rule.id == rule_id
+
+
+@pytest.mark.parametrize("message", [
+    "how do I download the notes",
+    "what is this",
+    "made a mistake in chemistry",
+    "hi there, can you recommend a book",
+])
+def test_no_substring_false_hits(rules, message):
+    assert rules.match(message).rule is None
+
+
+@pytest.mark.parametrize("message,intent", [
+    ("hey there", "greeting"),
+    ("thank you for listening", "thanks"),
+    ("I really appreciate it", "thanks"),
+    ("I'm worried about everything", "mental_health"),
+    ("see you tomorrow", "goodbye"),
+    ("what is this", "general"),
+    ("I need to download this", "general"),
+])
+def test_fallback_intents(rules, message, intent):
+    assert rules.match(message).intent == intent
+
+
+def test_priority_and_shared_prefixes():
+    rules = RuleSet(
+        [
+            {"id": "low", "priority": 50, "phrases": ["bad day"], "reply": "low"},
+            {"id": "high", "priority": 1, "phrases": ["bad"], "reply": "high"},
+        ],
+        [],
+    )
+    # "bad day" is the longest match but "bad" also matched at that position
+    assert rules.match("such a bad day").rule.id == "high"
+    assert rules.match("badday").rule is None
+
+
+def test_quick_reply_hot_reload(tmp_path, monkeypatch):
+    path = tmp_path / "quick_responses.json"
+    path.write_text(json.dumps({"rules": [{"id": "a", "phrases": ["pizza"], "reply": "yum"}], "intents": []}))
+    watched = WatchedJSON([path], build=RuleSet.from_dict, default=lambda: RuleSet([], []), interval=0)
+    monkeypatch.setattr(chatbot, "quick_rules", watched)
+    assert chatbot.quick_reply("I love pizza") == "yum"
+
+    path.write_text(json.dumps({"rules": [{"id": "a", "phrases": ["pizza"], "reply": "delicious"}], "intents": []}))
+    os.utime(path, (1, 1))
+    assert chatbot.quick_reply("I love pizza") == "delicious"
+    assert chatbot.classify_intent_fallback("I love pizza") == "general"
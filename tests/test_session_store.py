@@ -0,0 +1,115 @@
+import asyncio
+import multiprocessing
+import sys
+import threading
+import time
+
+import pytest
+
+from session_store import MemorySessionStore, SessionStore, SQLiteSessionStore
+
+
+def test_memory_lru_eviction():
+    store = MemorySessionStore(capacity=2, ttl=60)
+    store.save("a", {"last_topic": "A", "last_prompt_key": None})
+    store.save("b", {"last_topic": "B", "last_prompt_key": None})
+    store.get("a")  # a is now most recently used
+    store.save("c", {"last_topic": "C", "last_prompt_key": None})
+    assert len(store) == 2
+    assert store.get("b")["last_topic"] is None
+    assert store.get("a")["last_topic"] == "A"
+    assert store.stats()["evictions"] == 1
+
+
+def test_memory_ttl_and_stats():
+    store = MemorySessionStore(capacity=10, ttl=0.05)
+    store.save("a", {"last_topic": "A", "last_prompt_key": None})
+    assert store.get("a")["last_topic"] == "A"
+    time.sleep(0.06)
+    assert store.get("a")["last_topic"] is None
+    stats = store.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["approx_bytes"] > 0
+
+
+def test_memory_get_returns_copy():
+    store = MemorySessionStore()
+    sess = store.get("a")
+    sess["last_topic"] = "changed"
+    assert store.get("a")["last_topic"] is None
+
+
+def _write_from_worker(path):
+    SQLiteSessionStore(path).save("shared", {"last_topic": "from worker", "last_prompt_key": "k"})
+
+
+def test_sqlite_shared_between_processes(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SQLiteSessionStore(path)
+    proc = multiprocessing.get_context("spawn").Process(target=_write_from_worker, args=(path,))
+    proc.start()
+    proc.join(30)
+    assert proc.exitcode == 0
+    assert store.get("shared") == {"last_topic": "from worker", "last_prompt_key": "k"}
+
+
+def test_sqlite_capacity_and_ttl(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), capacity=3, ttl=60)
+    for i in range(5):
+        store.save(f"s{i}", {"last_topic": str(i), "last_prompt_key": None})
+    assert store.prune() == 2
+    assert len(store) == 3
+    assert store.get("s0")["last_topic"] is None
+    assert store.get("s4")["last_topic"] == "4"
+
+    store.ttl = 0
+    assert store.get("s4")["last_topic"] is None
+    assert store.stats()["approx_bytes"] > 0
+
+
+def test_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore(10, 60)
+
+
+def test_memory_approx_bytes_tracks_contents():
+    store = MemorySessionStore(capacity=3, ttl=60)
+
+    def walked():
+        return sys.getsizeof(store._data) + sum(
+            store._entry_bytes(k, sess) for k, (_, sess) in store._data.items()
+        )
+
+    for i in range(5):
+        store.save(f"s{i}", {"last_topic": "x" * (10 * i), "last_prompt_key": None})
+    store.save("s4", {"last_topic": "short", "last_prompt_key": "k"})
+    assert store.stats()["approx_bytes"] == walked()
+    store.ttl = 0
+    store.get("s3")
+    assert len(store) == 2 and store.stats()["approx_bytes"] == walked()
+
+
+def test_async_paths_run_sqlite_off_the_loop(tmp_path, isolated_chatbot, monkeypatch):
+    import chatbot
+
+    threads = []
+
+    class RecordingStore(SQLiteSessionStore):
+        def get(self, session_id):
+            threads.append(threading.current_thread())
+            return super().get(session_id)
+
+        def save(self, session_id, session):
+            threads.append(threading.current_thread())
+            super().save(session_id, session)
+
+    class Agent:
+        async def arun(self, query, max_tokens=128):
+            return "ok"
+
+    monkeypatch.setattr(chatbot, "session_store", RecordingStore(str(tmp_path / "sessions.db")))
+    reply = asyncio.run(chatbot.aprocess_message(Agent(), "my roommate and I keep arguing", session_id="t"))
+    assert reply == "ok"
+    assert len(threads) == 2 and threading.main_thread() not in threads
+    assert chatbot.session_store.get("t")["last_topic"] == "my roommate and I keep arguing"
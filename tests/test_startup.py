@@ -0,0 +1,131 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+import chatbot
+from intent_cascade import IntentCascade
+from intent_engine import IntentEngine
+from response_cache import ResponseCache
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class CountingBackend:
+    def __init__(self):
+        self.calls = 0
+
+    def score(self, messages):
+        self.calls += 1
+        return [[1.0] + [0.0] * 6 for _ in messages]
+
+
+def test_import_defers_agno():
+    code = "import sys, chatbot; print(sorted({m.split('.')[0] for m in sys.modules} & {'agno', 'torch', 'transformers'}))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+                         env=dict(os.environ, LOG_FILE="", LOG_CONSOLE="0")).stdout
+    assert out.strip() == "[]"
+
+
+def test_engine_load_does_not_run_the_model():
+    backend = CountingBackend()
+    engine = IntentEngine(backend_factory=lambda: backend)
+    assert engine.load() and engine.available
+    assert backend.calls == 0 and engine._worker is None
+    assert engine.warm_up() and backend.calls == 1
+
+
+def test_ready_after_warm_up(client, monkeypatch):
+    import server.main as server_main
+    backend = CountingBackend()
+    monkeypatch.setattr(chatbot, "intent_cascade", IntentCascade(IntentEngine(backend_factory=lambda: backend), []))
+    monkeypatch.setattr(server_main, "agent", None)
+    monkeypatch.setattr(server_main, "make_agent", lambda: object())
+    monkeypatch.setattr(server_main, "readiness", {"ready": False, "warmup_seconds": None,
+                                                   "intent_model": None, "agent": None, "error": None})
+
+    async def main():
+        before = await client.get("/ready")
+        await server_main.warm_up()
+        return before, await client.get("/ready")
+
+    before, after = asyncio.run(main())
+    assert before.status_code == 503
+    assert after.status_code == 200
+    assert after.json()["intent_model"] is True and after.json()["agent"] is True
+    assert backend.calls == 1 and server_main.agent is not None
+
+
+def test_warm_up_failure_is_reported(client, monkeypatch):
+    import server.main as server_main
+
+    def broken():
+        raise RuntimeError("model files missing")
+
+    monkeypatch.setattr(chatbot, "warm_up", broken)
+    monkeypatch.setattr(server_main, "readiness", {"ready": False, "warmup_seconds": None,
+                                                   "intent_model": None, "agent": None, "error": None})
+
+    async def main():
+        await server_main.warm_up()
+        return await client.get("/ready")
+
+    resp = asyncio.run(main())
+    assert resp.status_code == 503
+    assert resp.json()["error"] == "RuntimeError: model files missing"
+
+
+def test_main_module_does_not_duplicate_gauges():
+    # `python -m server.main` with WEB_CONCURRENCY>1 runs the module as __main__ and prefork imports it again
+    import runpy
+    import server.main as server_main
+    runpy.run_path(str(ROOT / "server" / "main.py"), run_name="server_main_again")
+    text = server_main.REGISTRY.render()
+    assert text.count("# TYPE pulse_llm_max_concurrency gauge") == 1
+
+
+def test_response_cache_reopens_after_fork(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResponseCache(capacity=8, path=path)
+    cache.put("warm", "up")
+    inherited = cache._thread
+    cache._writer_pid = -1  # as seen from a forked worker
+    cache.put("k", "reply")
+    assert cache._thread is not inherited and cache.flush(timeout=5)
+    assert ResponseCache(capacity=8, path=path).get("k") == "reply"
+
+
+def test_health_answers_while_the_agent_is_built(isolated_chatbot, client, monkeypatch):
+    import server.main as server_main
+    built = []
+
+    class Agent:
+        async def arun(self, query, max_tokens=128):
+            return "ok"
+
+    def slow_make_agent():
+        # Stands in for the agno import on a cold worker
+        time.sleep(0.3)
+        built.append(threading.current_thread())
+        return Agent()
+
+    monkeypatch.setattr(server_main, "agent", None)
+    monkeypatch.setattr(server_main, "make_agent", slow_make_agent)
+
+    async def main():
+        chats = [asyncio.create_task(client.post("/api/chat", json={"message": f"tell me something nice {i}"}))
+                 for i in range(2)]
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        health = await client.get("/health")
+        health_elapsed = time.perf_counter() - started
+        return [await c for c in chats], health, health_elapsed
+
+    chats, health, health_elapsed = asyncio.run(main())
+    assert health.status_code == 200 and health_elapsed < 0.1
+    assert [c.json()["reply"] for c in chats] == ["ok", "ok"]
+    assert len(built) == 1 and built[0] is not threading.main_thread()